@@ -17,14 +17,19 @@ import threading
 import time
 import csv
 import socket
+import selectors
 import serial
 import serial.tools.list_ports
 import queue
+import collections
 import datetime
 import json
 import platform
+import math
 import sys
 import os
+import atexit
+import concurrent.futures
 
 # Try to import PyVISA, handle gracefully if not available
 try:
@@ -34,11 +39,65 @@ except ImportError:
     VISA_AVAILABLE = False
     print("PyVISA not available. USB and GPIB connections will be limited.")
 
+# NumPy/Numba are optional; the monitoring store and the pulse-buffer
+# parsing fall back to plain Python lists, and the offline pulse
+# analysis is skipped when numpy is absent
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+def _nan_channel(cap):
+    """One NaN-filled monitoring channel: a float32 numpy array, or a
+    plain list when numpy is absent"""
+    if NUMPY_AVAILABLE:
+        return np.full(cap, np.nan, dtype=np.float32)
+    return [float('nan')] * cap
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Pre-bound %-template for the pulse-test ramp command: skips per-call
+# f-string assembly in the hot loop
+_CURR_LIM_TPL = ':BATT:TEST:CURR:LIM:SOUR %s'.__mod__
+
 class DeviceInterface:
     """Base class for device communication interfaces"""
     def __init__(self):
         self.connected = False
         self.connection = None
+        # Write-behind queue: write() only enqueues, a dedicated writer
+        # thread drains to the port so callers never block on I/O.
+        # query() joins the queue first so questions are never overtaken.
+        self._wq = queue.Queue()
+        self._write_error = None
+        self._writer = threading.Thread(target=self._drain_writes, daemon=True)
+        self._writer.start()
+        
+    def _drain_writes(self):
+        while True:
+            command = self._wq.get()
+            try:
+                if command is None:
+                    return
+                self._write_raw(command)
+            except Exception as e:
+                # A dropped write (e.g. an output-off command) must not
+                # die silently: remember it and surface it to the caller
+                # on their next write()/query()
+                self._write_error = e
+            finally:
+                self._wq.task_done()
+    
+    def _check_write_error(self):
+        """Raise any failure the writer thread recorded since the last check"""
+        if self._write_error is not None:
+            error, self._write_error = self._write_error, None
+            raise Exception(f"Queued write failed: {error}")
         
     def connect(self):
         raise NotImplementedError
@@ -47,6 +106,12 @@ class DeviceInterface:
         raise NotImplementedError
         
     def write(self, command):
+        if not self.connected:
+            raise Exception("Not connected")
+        self._check_write_error()
+        self._wq.put(command)
+        
+    def _write_raw(self, command):
         raise NotImplementedError
         
     def query(self, command):
@@ -59,6 +124,7 @@ class SerialInterface(DeviceInterface):
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
+        self._term = b'\r\n'
         
     def connect(self):
         try:
@@ -71,26 +137,37 @@ class SerialInterface(DeviceInterface):
                 timeout=self.timeout,
                 rtscts=True  # Hardware handshaking
             )
+            # Drop FTDI/USB-serial kernel latency from ~16ms to ~1ms where supported
+            try:
+                self.connection.set_low_latency_mode(True)
+            except Exception:
+                pass
             self.connected = True
             return True
         except Exception as e:
             raise Exception(f"Serial connection failed: {e}")
-            
+
     def disconnect(self):
+        self._wq.put(None)
+        # Let queued writes (output-off, SYST:LOC) reach the port before
+        # it closes; the sentinel's task_done marks the drain complete
+        self._wq.join()
         if self.connection:
             self.connection.close()
             self.connected = False
-            
-    def write(self, command):
-        if not self.connected:
-            raise Exception("Not connected")
-        cmd = command.strip() + '\r\n'
-        self.connection.write(cmd.encode())
-        
+
+    def _write_raw(self, command):
+        # ascii-encode then append the pre-built bytes terminator: one
+        # transient allocation per write instead of three
+        self.connection.write(command.encode('ascii').rstrip() + self._term)
+
     def query(self, command):
         self.write(command)
-        time.sleep(0.1)
-        response = self.connection.readline().decode().strip()
+        self._wq.join()  # ensure the question has actually gone out
+        self._check_write_error()
+        # read_until returns as soon as the terminator arrives;
+        # the port timeout bounds the wait, no fixed sleep needed
+        response = self.connection.read_until(b'\n').decode().strip()
         return response
 
 class EthernetInterface(DeviceInterface):
@@ -100,35 +177,74 @@ class EthernetInterface(DeviceInterface):
         self.host = host
         self.port = port
         self.timeout = timeout
+        self._term = b'\n'
         
     def connect(self):
         try:
             self.connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.connection.settimeout(self.timeout)
             self.connection.connect((self.host, self.port))
+            # Disable Nagle so short SCPI commands go out immediately
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
+            # Readiness-based reads: select() bounds each wait and returns
+            # immediately if the socket is closed, so a stuck query can be
+            # cancelled instead of hanging for the full timeout
+            self._sel = selectors.DefaultSelector()
+            self._sel.register(self.connection, selectors.EVENT_READ)
             self.connected = True
             return True
         except Exception as e:
             raise Exception(f"Ethernet connection failed: {e}")
-            
+
     def disconnect(self):
+        self._wq.put(None)
+        # Drain queued writes before the socket goes away
+        self._wq.join()
         if self.connection:
+            try:
+                self._sel.unregister(self.connection)
+                self._sel.close()
+            except:
+                pass
             self.connection.close()
             self.connected = False
-            
-    def write(self, command):
-        if not self.connected:
-            raise Exception("Not connected")
-        cmd = command.strip() + '\n'
-        self.connection.send(cmd.encode())
-        
+
+    def _write_raw(self, command):
+        self.connection.send(command.encode('ascii').rstrip() + self._term)
+
     def query(self, command):
         self.write(command)
-        response = self.connection.recv(1024).decode().strip()
-        return response
+        self._wq.join()  # ensure the question has actually gone out
+        self._check_write_error()
+        # Accumulate until the SCPI LF terminator - a single recv() can
+        # under-read multi-value replies
+        buf = bytearray()
+        while True:
+            if not self._sel.select(timeout=self.timeout):
+                raise TimeoutError(
+                    f"No response from {self.host}:{self.port} within {self.timeout}s")
+            chunk = self.connection.recv(4096)
+            if not chunk:
+                break
+            buf += chunk
+            if b'\n' in chunk:
+                break
+        return buf.decode().strip()
 
 class VISAInterface(DeviceInterface):
     """VISA communication interface for USB and GPIB"""
+    # One ResourceManager for all VISA devices: creating one dlopens the
+    # VISA library and enumerates sessions, which is slow on Windows
+    _rm = None
+    
+    @classmethod
+    def _get_rm(cls):
+        if cls._rm is None:
+            cls._rm = pyvisa.ResourceManager()
+            atexit.register(cls._rm.close)
+        return cls._rm
+    
     def __init__(self, resource_string, timeout=5000):
         super().__init__()
         self.resource_string = resource_string
@@ -138,8 +254,12 @@ class VISAInterface(DeviceInterface):
             
     def connect(self):
         try:
-            rm = pyvisa.ResourceManager()
-            self.connection = rm.open_resource(self.resource_string)
+            # pyvisa's ctypes bindings declare argtypes for viRead/viWrite,
+            # so CPython releases the GIL for the duration of blocking VISA
+            # I/O and the Tk event loop keeps running; open_timeout bounds
+            # the session setup itself
+            self.connection = self._get_rm().open_resource(
+                self.resource_string, open_timeout=self.timeout)
             self.connection.timeout = self.timeout
             self.connected = True
             return True
@@ -147,18 +267,21 @@ class VISAInterface(DeviceInterface):
             raise Exception(f"VISA connection failed: {e}")
             
     def disconnect(self):
+        self._wq.put(None)
+        # Drain queued writes before the resource goes away
+        self._wq.join()
         if self.connection:
             self.connection.close()
             self.connected = False
             
-    def write(self, command):
-        if not self.connected:
-            raise Exception("Not connected")
+    def _write_raw(self, command):
         self.connection.write(command)
         
     def query(self, command):
         if not self.connected:
             raise Exception("Not connected")
+        self._wq.join()  # drain pending writes before the round trip
+        self._check_write_error()
         return self.connection.query(command).strip()
 
 class DeviceController:
@@ -195,16 +318,19 @@ class DeviceController:
 
 class SorensenSGX(DeviceController):
     """Sorensen SGX400-12 D Power Supply Controller"""
+    MEASURE_CMD = "MEAS:VOLT?;:MEAS:CURR?"
+    
     def __init__(self, interface):
         super().__init__(interface)
         self.max_voltage = 400
         self.max_current = 12
+        self._volt_tpl = "SOUR:VOLT %s".__mod__
         
     def set_voltage(self, voltage):
         """Set output voltage in volts"""
         if not self.connected:
             raise Exception("Not connected")
-        self.interface.write(f"SOUR:VOLT {voltage}")
+        self.interface.write(self._volt_tpl(voltage))
         
     def set_current(self, current):
         """Set current limit in amperes"""
@@ -242,8 +368,20 @@ class SorensenSGX(DeviceController):
             raise Exception("Not connected")
         return float(self.interface.query("MEAS:CURR?"))
 
+    def measure_vi(self):
+        """Read voltage and current in a single compound query"""
+        if not self.connected:
+            raise Exception("Not connected")
+        if isinstance(self.interface, VISAInterface):
+            return tuple(self.interface.connection.query_ascii_values(
+                self.MEASURE_CMD, separator=';'))
+        v, _, i = self.interface.query(self.MEASURE_CMD).partition(';')
+        return float(v), float(i)
+
 class Keithley2281S(DeviceController):
     """Keithley 2281S Battery Simulator/Emulator Controller"""
+    MEASURE_CMD = ":MEAS:VOLT?;:MEAS:CURR?"
+    
     def __init__(self, interface):
         super().__init__(interface)
         self.max_voltage = 20
@@ -285,6 +423,16 @@ class Keithley2281S(DeviceController):
             raise Exception("Not connected")
         return float(self.interface.query(":MEAS:CURR?"))
         
+    def measure_vi(self):
+        """Read voltage and current in a single compound query"""
+        if not self.connected:
+            raise Exception("Not connected")
+        if isinstance(self.interface, VISAInterface):
+            return tuple(self.interface.connection.query_ascii_values(
+                self.MEASURE_CMD, separator=';'))
+        v, _, i = self.interface.query(self.MEASURE_CMD).partition(';')
+        return float(v), float(i)
+
     def battery_test_mode(self):
         """Switch to battery test function"""
         if not self.connected:
@@ -293,6 +441,8 @@ class Keithley2281S(DeviceController):
 
 class Prodigit34205A(DeviceController):
     """Prodigit 34205A Electronic Load Controller"""
+    MEASURE_CMD = "MEAS:VOLT?;:MEAS:CURR?;:MEAS:POW?"
+    
     def __init__(self, interface):
         super().__init__(interface)
         self.max_voltage = 600
@@ -362,9 +512,70 @@ class Prodigit34205A(DeviceController):
         if not self.connected:
             raise Exception("Not connected")
         return float(self.interface.query("MEAS:POW?"))
+        
+    def measure_all(self):
+        """Read voltage, current and power in a single compound query"""
+        if not self.connected:
+            raise Exception("Not connected")
+        reply = self.interface.query(self.MEASURE_CMD)
+        v, i, p = reply.split(';')
+        return float(v), float(i), float(p)
+
+# Interface builders keyed by the interface-combobox value; shared by all
+# three connect paths instead of a per-device if/elif ladder
+_BUILD = {
+    "RS232": lambda gui, dev: SerialInterface(
+        getattr(gui, f"{dev}_port").get(),
+        int(getattr(gui, f"{dev}_baudrate").get())),
+    "Ethernet": lambda gui, dev: EthernetInterface(
+        getattr(gui, f"{dev}_ip").get(),
+        int(getattr(gui, f"{dev}_tcp_port").get())),
+    "USB": lambda gui, dev: VISAInterface(getattr(gui, f"{dev}_resource").get()),
+    "GPIB": lambda gui, dev: VISAInterface(getattr(gui, f"{dev}_resource").get()),
+}
+
+def _esr_trace(t, v, i):
+    """Per-edge ESR estimates: -dV/dI wherever the load current steps"""
+    n = t.shape[0]
+    out = np.empty(n - 1)
+    m = 0
+    for k in range(1, n):
+        di = i[k] - i[k - 1]
+        if di > 0.05 or di < -0.05:
+            out[m] = -(v[k] - v[k - 1]) / di
+            m += 1
+    return out[:m]
+
+if NUMBA_AVAILABLE:
+    # cache=True amortizes the one-off JIT compile across sessions
+    _esr_trace = numba.njit(cache=True)(_esr_trace)
+
+def analyze_pulse(path):
+    """Offline ESR statistics for a finished pulse CSV"""
+    if not NUMPY_AVAILABLE:
+        return None
+    data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    if data.shape[0] < 2:
+        return None
+    esr = _esr_trace(np.ascontiguousarray(data[:, 0]),
+                     np.ascontiguousarray(data[:, 1]),
+                     np.ascontiguousarray(data[:, 2]))
+    if esr.size == 0:
+        return None
+    return float(esr.mean()), float(esr.min()), float(esr.max())
 
 class DeviceTestGUI:
     """Main GUI Application"""
+    # Lazily-built ResourceManager shared by the whole app; the first
+    # construction loads the VISA library and can take seconds
+    _rm = None
+    
+    @classmethod
+    def _get_rm(cls):
+        if cls._rm is None and VISA_AVAILABLE:
+            cls._rm = pyvisa.ResourceManager()
+        return cls._rm
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Multi-Device Test Controller")
@@ -380,94 +591,190 @@ class DeviceTestGUI:
         # Monitoring
         self.monitoring = False
         self.monitoring_thread = None
-        self.data_queue = queue.Queue()
+        # Single producer / single consumer: deque append/popleft are
+        # atomic under the GIL and skip queue.Queue's lock per operation
+        self.data_queue = collections.deque()
+        # Cached connection-settings frames, keyed (device, interface)
+        self._conn_frames = {}
+        self._conn_shown = {}
+        # Monitoring fans out over independent buses, one worker each.
+        # pyvisa sessions are not thread-safe, so each instrument gets its
+        # own lock (one per session, never a global one)
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+        self._locks = {name: threading.Lock() for name in self.devices}
+        # Serial-port enumeration cache (a slow WMI query on Windows)
+        self._ports_cache = []
+        self._ports_ts = 0.0
+        # Last text shown per measurement label, to skip no-op .config calls
+        self._last_shown = {}
+        # Bounded error log; repeats of the same fault are recorded once
+        self._err_deque = collections.deque(maxlen=100)
+        self._last_err_repr = None
+        # Sample interval cached as a float; the worker thread must not
+        # call widget .get() (a Tk round trip, and not thread-safe)
+        self._interval_var = tk.StringVar(value='1.0')
+        self._interval_var.trace_add('write', self._on_interval_change)
+        self._interval_s = 1.0
+        # Shared VISA resource picker, built on first use and hidden on
+        # close so Detect never rebuilds the dialog
+        self._visa_picker = None
+        self._visa_picker_list = None
+        self._visa_picker_target = None
+        # Query callables bound once per connect, so the monitoring loop
+        # skips the interface attribute walk on every sample
+        self._fast_read = {}
+        # Display ring: the Text widget only ever holds these lines, so
+        # render cost stays flat over arbitrarily long runs
+        self._ring = collections.deque(maxlen=500)
+        # O(1) dispatch from the mode code to the matching driver method
+        self._prodigit_mode_funcs = {
+            "CC": Prodigit34205A.set_mode_cc,
+            "CV": Prodigit34205A.set_mode_cv,
+            "CP": Prodigit34205A.set_mode_cp,
+            "CR": Prodigit34205A.set_mode_cr,
+        }
         
         # Create GUI
         self.create_gui()
         
-        # Start monitoring data updates
-        self.root.after(100, self.update_monitoring_display)
+        # Event-driven display wakeups where Tk exposes file handlers
+        # (X11): the producers write one byte per enqueue and the display
+        # only runs when data arrives. Windows Tk has no createfilehandler,
+        # so fall back to the 200 ms poll there.
+        self._wakeup_rd = self._wakeup_wr = None
+        try:
+            rd, wr = os.pipe()
+            self.root.tk.createfilehandler(rd, tk.READABLE, self._on_data_ready)
+            self._wakeup_rd, self._wakeup_wr = rd, wr
+        except AttributeError:
+            self.root.after(200, self.update_monitoring_display)
+        
+        # Pre-warm the VISA library off-thread so the first Detect click
+        # doesn't pay the multi-second ResourceManager construction
+        if VISA_AVAILABLE:
+            threading.Thread(target=self._get_rm, daemon=True).start()
         
     def run_keithley_pulse_test(self):
         if not self.devices['keithley'] or not self.devices['keithley'].connected:
             messagebox.showerror("Error", "Keithley not connected")
             return
 
+        # Run the test in a worker thread so the multi-minute sample loop
+        # does not block the Tk event loop
+        threading.Thread(target=self._pulse_worker, daemon=True).start()
+
+    def _pulse_worker(self):
         try:
-            import csv, datetime, time
+            import datetime, time
             device = self.devices['keithley']
             interface = device.interface
             w = interface.write
             q = interface.query
+            # Bind hot-loop lookups to locals once (saves a LOAD_ATTR per call)
+            _mono = time.monotonic
+            _sleep = time.sleep
+            # Pre-bound bytes %-template: one C-level format call per row
+            _row = b'%.3f,%.6f,%.6f\n'.__mod__
 
             PULSES, PULSE_T, REST_T = 2, 30, 30
             RAMP_UP, RAMP_DN = [0.05, 0.20], [0.20, 0.05]
             I_PULSE, I_REST = 1.0, 0.0001
             SAMP_INT, STEP, EVOC_DLY = 0.5, 0.5, 0.05
 
-            def last_vi():
-                buf = q(':BATT:DATA:DATA? \"VOLT,CURR,REL\"')
+            # Incremental buffer fetch: only pull rows added since the last poll
+            # instead of re-transferring the whole buffer every STEP
+            self._last_n = 0
+
+            def fetch_new_rows():
+                npts = int(q(':BATT:DATA:POIN?'))
+                if npts <= self._last_n:
+                    return None
+                start, count = self._last_n + 1, npts - self._last_n
+                buf = q(f':BATT:DATA:DATA:SEL? {start},{count},\"VOLT,CURR,REL\"')
                 if not buf:
-                    return None, None, None
-                vals = list(map(float, buf.split(',')[-3:]))
-                return vals[0], vals[1], vals[2]
+                    return None
+                self._last_n = npts
+                if NUMPY_AVAILABLE:
+                    return np.array(buf.split(','), dtype=float).reshape(-1, 3)
+                vals = [float(x) for x in buf.split(',')]
+                return [vals[j:j + 3] for j in range(0, len(vals) - 2, 3)]
 
-            w('*CLS'); w('SYST:REM')
-            w(':FUNC TEST')
-            w(':BATT:TEST:MODE DIS')
-            w(f':BATT:TEST:SENS:SAMP:INT {SAMP_INT}')
-            w(f':BATT:TEST:SENS:EVOC:DELA {EVOC_DLY}')
-            w(':FORM:UNITS OFF'); w(':SYST:AZER OFF')
-            w(':BATT:DATA:CLE'); w(':BATT:DATA:STAT ON')
-            w(':BATT:TEST:EXEC STAR')
+            # One semicolon-chained compound command: the whole init sequence
+            # goes out in a single write instead of eleven round trips
+            w('*CLS;SYST:REM;:FUNC TEST;:BATT:TEST:MODE DIS'
+              ';:BATT:TEST:SENS:SAMP:INT %s;:BATT:TEST:SENS:EVOC:DELA %s'
+              ';:FORM:UNITS OFF;:SYST:AZER OFF'
+              ';:BATT:DATA:CLE;:BATT:DATA:STAT ON'
+              ';:BATT:TEST:EXEC STAR' % (SAMP_INT, EVOC_DLY))
 
             stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            fpulse = open(f'pulse_bt_{stamp}.csv','w',newline=''); wp = csv.writer(fpulse)
-            frest  = open(f'rest_evoc_{stamp}.csv','w',newline=''); wr = csv.writer(frest)
-            wp.writerow(['t_rel_s','volt_v','curr_a'])
-            wr.writerow(['t_rel_s','voc_v','esr_ohm'])
-            t0 = time.time()
+            pulse_name, rest_name = f'pulse_bt_{stamp}.csv', f'rest_evoc_{stamp}.csv'
+            # Context managers close the CSVs even if the test raises mid-run
+            # Binary mode skips the TextIOWrapper encode/newline layer; rows
+            # are formatted straight to bytes
+            with open(pulse_name,'wb') as fpulse, open(rest_name,'wb') as frest:
+                fpulse.write(b't_rel_s,volt_v,curr_a\n')
+                frest.write(b't_rel_s,voc_v,esr_ohm\n')
+                t0 = _mono()
+
+                def log_new_rows():
+                    rows = fetch_new_rows()
+                    if rows is not None:
+                        fpulse.writelines(_row((rel, v, i)) for v,i,rel in rows)
 
-            for cyc in range(1, PULSES+1):
-                for lim in RAMP_UP:
-                    w(f':BATT:TEST:CURR:LIM:SOUR {lim}'); w(':BATT:OUTP ON')
-                    end = time.time()+2
-                    while time.time()<end:
-                        v,i,rel = last_vi()
-                        if v is not None: wp.writerow([f'{rel:.3f}',f'{v:.6f}',f'{i:.6f}']); fpulse.flush()
-                        time.sleep(STEP)
+                def poll_phase(duration, sample):
+                    # Absolute-deadline schedule on the monotonic clock: cadence does
+                    # not drift with per-iteration service time or wall-clock jumps
+                    phase_end = _mono() + duration
+                    next_tick = _mono() + STEP
+                    while _mono() < phase_end:
+                        sample()
+                        _sleep(max(0, next_tick - _mono()))
+                        next_tick += STEP
 
-                w(f':BATT:TEST:CURR:LIM:SOUR {I_PULSE}')
-                end = time.time()+PULSE_T
-                while time.time()<end:
-                    v,i,rel = last_vi()
-                    if v is not None: wp.writerow([f'{rel:.3f}',f'{v:.6f}',f'{i:.6f}']); fpulse.flush()
-                    time.sleep(STEP)
+                for cyc in range(1, PULSES+1):
+                    for lim in RAMP_UP:
+                        w(_CURR_LIM_TPL(lim)); w(':BATT:OUTP ON')
+                        poll_phase(2, log_new_rows)
 
-                for lim in RAMP_DN:
-                    w(f':BATT:TEST:CURR:LIM:SOUR {lim}')
-                    end = time.time()+2
-                    while time.time()<end:
-                        v,i,rel = last_vi()
-                        if v is not None: wp.writerow([f'{rel:.3f}',f'{v:.6f}',f'{i:.6f}']); fpulse.flush()
-                        time.sleep(STEP)
+                    w(_CURR_LIM_TPL(I_PULSE))
+                    poll_phase(PULSE_T, log_new_rows)
 
-                w(':BATT:OUTP OFF'); w(f':BATT:TEST:CURR:LIM:SOUR {I_REST}')
-                end = time.time()+REST_T
-                while time.time()<end:
-                    esr,voc = map(float,q(':BATT:TEST:MEAS:EVOC?').split(','))
-                    wr.writerow([f'{time.time()-t0:.3f}',f'{voc:.6f}',f'{esr:.6f}']); frest.flush()
-                    time.sleep(STEP)
+                    for lim in RAMP_DN:
+                        w(_CURR_LIM_TPL(lim))
+                        poll_phase(2, log_new_rows)
+
+                    w(':BATT:OUTP OFF'); w(_CURR_LIM_TPL(I_REST))
+                    fpulse.flush()  # one flush per pulse phase instead of per row
+                    rest_batch = []
+
+                    def log_evoc():
+                        # partition avoids the intermediate list split() builds
+                        # for this fixed two-field reply
+                        a, _, b = q(':BATT:TEST:MEAS:EVOC?').partition(',')
+                        esr, voc = float(a), float(b)
+                        rest_batch.append(_row((_mono()-t0, voc, esr)))
+                        if len(rest_batch) >= 32:
+                            frest.writelines(rest_batch); rest_batch.clear()
+
+                    poll_phase(REST_T, log_evoc)
+                    frest.writelines(rest_batch); frest.flush()
 
             w(':BATT:OUTP OFF'); w('SYST:LOC')
-            fpulse.close(); frest.close()
             interface.disconnect()
 
-            messagebox.showinfo("Pulse Test", f"✔ Test tamamlandı.\nPulse CSV: {fpulse.name}\nRest CSV: {frest.name}")
+            # Acquisition is done - analyze the closed CSV offline
+            stats = analyze_pulse(pulse_name)
+            if stats:
+                print(f"ESR trace: mean={stats[0]:.6f} min={stats[1]:.6f} max={stats[2]:.6f} ohm")
 
+            # messagebox must run on the Tk thread - hand off via the queue
+            self.data_queue.append(("pulse_done", pulse_name, rest_name))
+            self._notify_data()
 
         except Exception as e:
-            messagebox.showerror("Error", f"Pulse test failed: {e}")
+            self.data_queue.append(("pulse_error", str(e)))
+            self._notify_data()
 
     def create_gui(self):
         """Create the main GUI interface"""
@@ -713,9 +1020,9 @@ class DeviceTestGUI:
         
         # Monitoring controls
         ttk.Label(control_frame, text="Sample Interval (s):").grid(row=0, column=0, sticky='w')
-        self.sample_interval = ttk.Entry(control_frame, width=10)
+        self.sample_interval = ttk.Entry(control_frame, width=10,
+                                         textvariable=self._interval_var)
         self.sample_interval.grid(row=0, column=1, padx=5)
-        self.sample_interval.insert(0, "1.0")
         
         self.monitor_btn = ttk.Button(control_frame, text="Start Monitoring", 
                                     command=self.toggle_monitoring)
@@ -727,16 +1034,29 @@ class DeviceTestGUI:
         ttk.Button(control_frame, text="Clear Data", 
                   command=self.clear_data).grid(row=0, column=4, padx=5)
         
+        ttk.Button(control_frame, text="View Errors", 
+                  command=self.show_errors).grid(row=0, column=5, padx=5)
+        
         # Data display
         data_frame = ttk.LabelFrame(frame, text="Monitoring Data")
         data_frame.pack(fill='both', expand=True, padx=5, pady=5)
         
-        # Create scrolled text widget for data display
-        self.data_display = scrolledtext.ScrolledText(data_frame, height=20)
+        # Create scrolled text widget for data display; disabled so the
+        # only writes are the batched ring renders
+        self.data_display = scrolledtext.ScrolledText(data_frame, height=20, state='disabled')
         self.data_display.pack(fill='both', expand=True, padx=5, pady=5)
         
-        # Data storage
-        self.monitoring_data = []
+        # Structure-of-arrays sample store: one float32 array per channel
+        # plus a timestamp list - roughly 10x smaller than a list of dicts.
+        # MONITOR_CAP bounds the store; past it the oldest half is dropped
+        # so week-long sessions cannot exhaust memory
+        self._max_samples = int(os.environ.get('MONITOR_CAP', 100_000))
+        self._cap = min(4096, self._max_samples)
+        self._n = 0
+        self._ts = []
+        self._ch = {k: _nan_channel(self._cap)
+                    for k in ('sorensen_v', 'sorensen_i', 'keithley_v', 'keithley_i',
+                      'prodigit_v', 'prodigit_i', 'prodigit_p')}
         
     def on_sorensen_interface_change(self, event=None):
         """Handle Sorensen interface selection change"""
@@ -766,26 +1086,47 @@ class DeviceTestGUI:
             self.prodigit_unit.config(text="Ω")
             
     def create_connection_settings(self, parent, interface, device):
-        """Create dynamic connection settings based on interface type"""
-        # Clear existing widgets
-        for widget in parent.winfo_children():
-            widget.destroy()
-            
-        if interface == "RS232":
-            self.create_serial_settings(parent, device)
-        elif interface == "Ethernet":
-            self.create_ethernet_settings(parent, device)
-        elif interface in ["USB", "GPIB"]:
-            self.create_visa_settings(parent, device, interface)
-            
+        """Show connection settings for the selected interface type"""
+        # Swap cached frames instead of destroying and rebuilding widgets:
+        # Tk destroy/create is slow, pack/pack_forget is cheap
+        shown = self._conn_shown.get(device)
+        if shown is not None:
+            shown.pack_forget()
+            
+        key = (device, interface)
+        settings = self._conn_frames.get(key)
+        if settings is None:
+            settings = ttk.Frame(parent)
+            if interface == "RS232":
+                self.create_serial_settings(settings, device)
+            elif interface == "Ethernet":
+                self.create_ethernet_settings(settings, device)
+            elif interface in ["USB", "GPIB"]:
+                self.create_visa_settings(settings, device, interface)
+            self._conn_frames[key] = settings
+            
+        settings.pack(fill='x')
+        self._conn_shown[device] = settings
+            
+    def _get_serial_ports(self, force=False):
+        """Enumerate serial ports with a short TTL cache"""
+        now = time.monotonic()
+        if not force and now - self._ports_ts < 2.0:
+            return self._ports_cache
+        self._ports_cache = [port.device for port in serial.tools.list_ports.comports()]
+        self._ports_ts = now
+        return self._ports_cache
+        
     def create_serial_settings(self, parent, device):
         """Create RS232 serial connection settings"""
         ttk.Label(parent, text="Port:").grid(row=0, column=0, sticky='w')
         
-        # Get available serial ports
-        ports = [port.device for port in serial.tools.list_ports.comports()]
-        port_combo = ttk.Combobox(parent, values=ports)
+        # Cached port list shared by all three device panels; the dropdown
+        # re-enumerates on open so newly plugged adapters still show up
+        port_combo = ttk.Combobox(parent, values=self._get_serial_ports())
         port_combo.grid(row=0, column=1, padx=5)
+        port_combo.configure(postcommand=lambda c=port_combo: c.configure(
+            values=self._get_serial_ports(force=True)))
         setattr(self, f"{device}_port", port_combo)
         
         ttk.Label(parent, text="Baud Rate:").grid(row=0, column=2, sticky='w')
@@ -858,77 +1199,112 @@ class DeviceTestGUI:
                   command=lambda: self.detect_visa_resources(device)).grid(row=0, column=2, padx=5)
         
     def detect_visa_resources(self, device):
-        """Detect available VISA resources"""
+        """Detect available VISA resources without blocking the GUI"""
         if not VISA_AVAILABLE:
             messagebox.showerror("Error", "PyVISA not available")
             return
             
-        try:
-            rm = pyvisa.ResourceManager()
-            resources = rm.list_resources()
-            
-            if resources:
-                # Create a selection dialog
-                selection_window = tk.Toplevel(self.root)
-                selection_window.title("Select VISA Resource")
-                selection_window.geometry("400x200")
-                
-                ttk.Label(selection_window, text="Available Resources:").pack(pady=5)
-                
-                listbox = tk.Listbox(selection_window)
-                listbox.pack(fill='both', expand=True, padx=10, pady=5)
-                
-                for resource in resources:
-                    listbox.insert(tk.END, resource)
-                    
-                def select_resource():
-                    selection = listbox.curselection()
-                    if selection:
-                        selected_resource = listbox.get(selection[0])
-                        getattr(self, f"{device}_resource").delete(0, tk.END)
-                        getattr(self, f"{device}_resource").insert(0, selected_resource)
-                        selection_window.destroy()
-                        
-                ttk.Button(selection_window, text="Select", 
-                          command=select_resource).pack(pady=5)
-            else:
-                messagebox.showinfo("Info", "No VISA resources found")
+        # Indeterminate progressbar while the background scan runs
+        progress = ttk.Progressbar(self.root, mode='indeterminate')
+        progress.pack(side='bottom', fill='x')
+        progress.start(10)
+        
+        def scan():
+            try:
+                rm = self._get_rm()
+                # Scan the four interface classes concurrently so total
+                # time is the slowest class, not the sum of all four
+                queries = ('USB?*INSTR', 'GPIB?*INSTR', 'TCPIP?*INSTR', 'ASRL?*INSTR')
+                found = set()
+                with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+                    futures = [pool.submit(rm.list_resources, query) for query in queries]
+                    for future in concurrent.futures.as_completed(futures):
+                        try:
+                            found.update(future.result())
+                        except:
+                            pass
+                self.root.after(0, lambda: self._populate_resource_list(
+                    device, sorted(found), progress))
+            except Exception as e:
+                self.root.after(0, lambda: self._detect_failed(e, progress))
                 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to detect resources: {e}")
+        threading.Thread(target=scan, daemon=True).start()
+        
+    def _detect_failed(self, error, progress):
+        progress.stop()
+        progress.destroy()
+        messagebox.showerror("Error", f"Failed to detect resources: {error}")
+        
+    def _populate_resource_list(self, device, resources, progress):
+        """Show scan results in the shared picker (runs on the Tk thread)"""
+        progress.stop()
+        progress.destroy()
+        
+        if not resources:
+            messagebox.showinfo("Info", "No VISA resources found")
+            return
+            
+        # One picker serves all three devices: built on the first Detect,
+        # then only deiconified and refilled
+        self._visa_picker_target = device
+        if self._visa_picker is None:
+            self._visa_picker = tk.Toplevel(self.root)
+            self._visa_picker.title("Select VISA Resource")
+            self._visa_picker.geometry("400x200")
+            self._visa_picker.protocol("WM_DELETE_WINDOW", self._visa_picker.withdraw)
+            
+            ttk.Label(self._visa_picker, text="Available Resources:").pack(pady=5)
+            
+            self._visa_picker_list = tk.Listbox(self._visa_picker)
+            self._visa_picker_list.pack(fill='both', expand=True, padx=10, pady=5)
+            
+            ttk.Button(self._visa_picker, text="Select", 
+                      command=self._select_visa_resource).pack(pady=5)
+        else:
+            self._visa_picker.deiconify()
+            
+        self._visa_picker_list.delete(0, tk.END)
+        for resource in resources:
+            self._visa_picker_list.insert(tk.END, resource)
+        self._visa_picker.lift()
+        
+    def _select_visa_resource(self):
+        selection = self._visa_picker_list.curselection()
+        if selection:
+            selected_resource = self._visa_picker_list.get(selection[0])
+            entry = getattr(self, f"{self._visa_picker_target}_resource")
+            entry.delete(0, tk.END)
+            entry.insert(0, selected_resource)
+            self._visa_picker.withdraw()
             
     # Device connection methods
-    def connect_sorensen(self):
-        """Connect to Sorensen SGX400-12"""
+    def _connect(self, dev, cls, label):
+        """Generic connect shared by the three device buttons"""
         try:
-            interface_type = self.sorensen_interface.get()
-            
-            if interface_type == "RS232":
-                port = self.sorensen_port.get()
-                baudrate = int(self.sorensen_baudrate.get())
-                interface = SerialInterface(port, baudrate)
-            elif interface_type == "Ethernet":
-                ip = self.sorensen_ip.get()
-                port = int(self.sorensen_tcp_port.get())
-                interface = EthernetInterface(ip, port)
-            elif interface_type == "GPIB":
-                resource = self.sorensen_resource.get()
-                interface = VISAInterface(resource)
-            else:
+            builder = _BUILD.get(getattr(self, f"{dev}_interface").get())
+            if builder is None:
                 raise Exception("Invalid interface type")
                 
-            self.devices['sorensen'] = SorensenSGX(interface)
-            self.devices['sorensen'].connect()
+            self.devices[dev] = cls(builder(self, dev))
+            self.devices[dev].connect()
+            # Per-device compound read: Prodigit reads V/I/P, the other
+            # two read V/I, and the VISA variants use query_ascii_values
+            device = self.devices[dev]
+            self._fast_read[dev] = getattr(device, 'measure_all', None) or device.measure_vi
             
-            self.sorensen_status.config(text="Connected", foreground="green")
-            self.sorensen_connect_btn.config(text="Disconnect", 
-                                           command=self.disconnect_sorensen)
+            getattr(self, f"{dev}_status").config(text="Connected", foreground="green")
+            getattr(self, f"{dev}_connect_btn").config(
+                text="Disconnect", command=getattr(self, f"disconnect_{dev}"))
             
-            messagebox.showinfo("Success", f"Connected to Sorensen SGX400-12\n{self.devices['sorensen'].model}")
+            messagebox.showinfo("Success", f"Connected to {label}\n{self.devices[dev].model}")
             
         except Exception as e:
             messagebox.showerror("Connection Error", f"Failed to connect: {e}")
             
+    def connect_sorensen(self):
+        """Connect to Sorensen SGX400-12"""
+        self._connect('sorensen', SorensenSGX, "Sorensen SGX400-12")
+            
     def disconnect_sorensen(self):
         """Disconnect from Sorensen SGX400-12"""
         if self.devices['sorensen']:
@@ -940,33 +1316,7 @@ class DeviceTestGUI:
         
     def connect_keithley(self):
         """Connect to Keithley 2281S"""
-        try:
-            interface_type = self.keithley_interface.get()
-            
-            if interface_type == "USB":
-                resource = self.keithley_resource.get()
-                interface = VISAInterface(resource)
-            elif interface_type == "Ethernet":
-                ip = self.keithley_ip.get()
-                port = int(self.keithley_tcp_port.get())
-                interface = EthernetInterface(ip, port)
-            elif interface_type == "GPIB":
-                resource = self.keithley_resource.get()
-                interface = VISAInterface(resource)
-            else:
-                raise Exception("Invalid interface type")
-                
-            self.devices['keithley'] = Keithley2281S(interface)
-            self.devices['keithley'].connect()
-            
-            self.keithley_status.config(text="Connected", foreground="green")
-            self.keithley_connect_btn.config(text="Disconnect", 
-                                           command=self.disconnect_keithley)
-            
-            messagebox.showinfo("Success", f"Connected to Keithley 2281S\n{self.devices['keithley'].model}")
-            
-        except Exception as e:
-            messagebox.showerror("Connection Error", f"Failed to connect: {e}")
+        self._connect('keithley', Keithley2281S, "Keithley 2281S")
             
     def disconnect_keithley(self):
         """Disconnect from Keithley 2281S"""
@@ -979,34 +1329,7 @@ class DeviceTestGUI:
         
     def connect_prodigit(self):
         """Connect to Prodigit 34205A"""
-        try:
-            interface_type = self.prodigit_interface.get()
-            
-            if interface_type == "RS232":
-                port = self.prodigit_port.get()
-                baudrate = int(self.prodigit_baudrate.get())
-                interface = SerialInterface(port, baudrate)
-            elif interface_type == "Ethernet":
-                ip = self.prodigit_ip.get()
-                port = int(self.prodigit_tcp_port.get())
-                interface = EthernetInterface(ip, port)
-            elif interface_type in ["USB", "GPIB"]:
-                resource = self.prodigit_resource.get()
-                interface = VISAInterface(resource)
-            else:
-                raise Exception("Invalid interface type")
-                
-            self.devices['prodigit'] = Prodigit34205A(interface)
-            self.devices['prodigit'].connect()
-            
-            self.prodigit_status.config(text="Connected", foreground="green")
-            self.prodigit_connect_btn.config(text="Disconnect", 
-                                           command=self.disconnect_prodigit)
-            
-            messagebox.showinfo("Success", f"Connected to Prodigit 34205A\n{self.devices['prodigit'].model}")
-            
-        except Exception as e:
-            messagebox.showerror("Connection Error", f"Failed to connect: {e}")
+        self._connect('prodigit', Prodigit34205A, "Prodigit 34205A")
             
     def disconnect_prodigit(self):
         """Disconnect from Prodigit 34205A"""
@@ -1117,17 +1440,10 @@ class DeviceTestGUI:
             
         try:
             value = float(self.prodigit_value.get())
-            mode = self.prodigit_mode.get()
-            
-            if "CC" in mode:
-                self.devices['prodigit'].set_mode_cc(value)
-            elif "CV" in mode:
-                self.devices['prodigit'].set_mode_cv(value)
-            elif "CP" in mode:
-                self.devices['prodigit'].set_mode_cp(value)
-            elif "CR" in mode:
-                self.devices['prodigit'].set_mode_cr(value)
-                
+            # Combobox values start with the two-letter mode code
+            code = self.prodigit_mode.get()[:2]
+            self._prodigit_mode_funcs[code](self.devices['prodigit'], value)
+            
             messagebox.showinfo("Success", "Parameters set successfully")
             
         except Exception as e:
@@ -1180,102 +1496,187 @@ class DeviceTestGUI:
         self.monitoring = False
         self.monitor_btn.config(text="Start Monitoring")
         
+    def _on_interval_change(self, *args):
+        """Re-parse the interval only when the entry actually changes"""
+        try:
+            self._interval_s = float(self._interval_var.get())
+        except ValueError:
+            pass
+            
     def monitoring_worker(self):
         """Worker thread for monitoring devices"""
         while self.monitoring:
             try:
-                interval = float(self.sample_interval.get())
-                timestamp = datetime.datetime.now()
+                interval = self._interval_s
                 
                 data_point = {
-                    'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+                    # Raw integer clock read; formatting is deferred to the
+                    # display/save paths (strftime is expensive per sample)
+                    'timestamp_ns': time.time_ns(),
                     'sorensen_v': None, 'sorensen_i': None,
                     'keithley_v': None, 'keithley_i': None,
                     'prodigit_v': None, 'prodigit_i': None, 'prodigit_p': None
                 }
                 
-                # Read Sorensen measurements
-                if self.devices['sorensen'] and self.devices['sorensen'].connected:
-                    try:
-                        data_point['sorensen_v'] = self.devices['sorensen'].measure_voltage()
-                        data_point['sorensen_i'] = self.devices['sorensen'].measure_current()
-                    except:
-                        pass
-                        
-                # Read Keithley measurements
-                if self.devices['keithley'] and self.devices['keithley'].connected:
-                    try:
-                        data_point['keithley_v'] = self.devices['keithley'].measure_voltage()
-                        data_point['keithley_i'] = self.devices['keithley'].measure_current()
-                    except:
-                        pass
-                        
-                # Read Prodigit measurements
-                if self.devices['prodigit'] and self.devices['prodigit'].connected:
-                    try:
-                        data_point['prodigit_v'] = self.devices['prodigit'].measure_voltage()
-                        data_point['prodigit_i'] = self.devices['prodigit'].measure_current()
-                        data_point['prodigit_p'] = self.devices['prodigit'].measure_power()
-                    except:
-                        pass
-                        
+                # Sample every connected device in parallel: the buses are
+                # independent, so the tick costs max-of-3 instead of sum-of-3.
+                # Snapshot the device dict first so a disconnect from the Tk
+                # thread mid-cycle cannot tear the iteration
+                devs = dict(self.devices)
+                futures = [self._pool.submit(self._sample_device, name, dev, data_point)
+                           for name, dev in devs.items()
+                           if dev and dev.connected]
+                if futures:
+                    # Bound the wait below the sample interval so one stuck
+                    # device cannot stall the whole monitoring cadence
+                    concurrent.futures.wait(futures, timeout=interval * 0.9)
+                    
+
                 # Queue data for GUI update
-                self.data_queue.put(data_point)
+                self.data_queue.append(data_point)
+                self._notify_data()
                 
                 time.sleep(interval)
                 
             except Exception as e:
-                print(f"Monitoring error: {e}")
+                # Record once per distinct fault: no per-iteration string
+                # build or stdout lock while a device repeats the same error
+                r = repr(e)
+                if r != self._last_err_repr:
+                    self._err_deque.append((time.time(), r))
+                    self._last_err_repr = r
                 time.sleep(1)
                 
+    def _sample_device(self, name, device, data_point):
+        """Sample one device into data_point; runs on the monitoring pool"""
+        try:
+            with self._locks[name]:
+                reader = (self._fast_read.get(name)
+                          or getattr(device, 'measure_all', None) or device.measure_vi)
+                values = reader()
+            if name == 'prodigit':
+                (data_point['prodigit_v'], data_point['prodigit_i'],
+                 data_point['prodigit_p']) = values
+            else:
+                data_point[f'{name}_v'], data_point[f'{name}_i'] = values
+        except:
+            pass
+            
+    def _notify_data(self):
+        """Wake the display handler after enqueuing (no-op when polling)"""
+        if self._wakeup_wr is not None:
+            try:
+                os.write(self._wakeup_wr, b'.')
+            except OSError:
+                pass
+                
+    def _on_data_ready(self, file, mask):
+        """Tk file handler: drain the wakeup pipe, then the data queue"""
+        os.read(self._wakeup_rd, 4096)
+        self._drain_display()
+        
     def update_monitoring_display(self):
+        """Polling fallback for platforms without Tk file handlers"""
+        self._drain_display()
+        self.root.after(200, self.update_monitoring_display)
+        
+    def _drain_display(self):
         """Update monitoring display with new data"""
-        try:
-            while True:
-                data_point = self.data_queue.get_nowait()
+        # Drain the queue fully each tick, then touch the widgets once:
+        # one big Text.insert amortizes Tk's line-index recomputation
+        items = []
+        while True:
+            try:
+                items.append(self.data_queue.popleft())
+            except IndexError:
+                break
                 
-                # Update measurement displays
-                if data_point['sorensen_v'] is not None:
-                    self.sorensen_volt_meas.config(text=f"Voltage: {data_point['sorensen_v']:.3f} V")
-                if data_point['sorensen_i'] is not None:
-                    self.sorensen_curr_meas.config(text=f"Current: {data_point['sorensen_i']:.3f} A")
-                    
-                if data_point['keithley_v'] is not None:
-                    self.keithley_volt_meas.config(text=f"Voltage: {data_point['keithley_v']:.3f} V")
-                if data_point['keithley_i'] is not None:
-                    self.keithley_curr_meas.config(text=f"Current: {data_point['keithley_i']:.3f} A")
-                    
-                if data_point['prodigit_v'] is not None:
-                    self.prodigit_volt_meas.config(text=f"Voltage: {data_point['prodigit_v']:.3f} V")
-                if data_point['prodigit_i'] is not None:
-                    self.prodigit_curr_meas.config(text=f"Current: {data_point['prodigit_i']:.3f} A")
-                if data_point['prodigit_p'] is not None:
-                    self.prodigit_pow_meas.config(text=f"Power: {data_point['prodigit_p']:.3f} W")
-                    
-                # Add to monitoring data
-                self.monitoring_data.append(data_point)
+        latest = None
+        lines = []
+        for data_point in items:
+            # Status tuples from the pulse-test worker thread
+            if isinstance(data_point, tuple):
+                if data_point[0] == "pulse_done":
+                    messagebox.showinfo("Pulse Test",
+                                        f"✔ Test tamamlandı.\nPulse CSV: {data_point[1]}\nRest CSV: {data_point[2]}")
+                elif data_point[0] == "pulse_error":
+                    messagebox.showerror("Error", f"Pulse test failed: {data_point[1]}")
+                continue
                 
-                # Update data display
-                data_line = f"{data_point['timestamp']}: "
-                if data_point['sorensen_v'] is not None:
-                    data_line += f"SGX: {data_point['sorensen_v']:.3f}V {data_point['sorensen_i']:.3f}A | "
-                if data_point['keithley_v'] is not None:
-                    data_line += f"2281S: {data_point['keithley_v']:.3f}V {data_point['keithley_i']:.3f}A | "
-                if data_point['prodigit_v'] is not None:
-                    data_line += f"34205A: {data_point['prodigit_v']:.3f}V {data_point['prodigit_i']:.3f}A {data_point['prodigit_p']:.3f}W"
-                    
-                self.data_display.insert(tk.END, data_line + '\n')
-                self.data_display.see(tk.END)
+            self._append_sample(data_point)
+            
+            # One float->str conversion per channel, shared by the log
+            # line and the measurement labels below
+            strs = {k: (f'{v:.3f}' if v is not None else None)
+                    for k, v in data_point.items() if k != 'timestamp_ns'}
+            latest = strs
+            
+            shown_ts = datetime.datetime.fromtimestamp(
+                data_point['timestamp_ns'] / 1e9).strftime('%H:%M:%S.%f')[:-3]
+            data_line = f"{shown_ts}: "
+            if strs['sorensen_v'] is not None:
+                data_line += f"SGX: {strs['sorensen_v']}V {strs['sorensen_i']}A | "
+            if strs['keithley_v'] is not None:
+                data_line += f"2281S: {strs['keithley_v']}V {strs['keithley_i']}A | "
+            if strs['prodigit_v'] is not None:
+                data_line += f"34205A: {strs['prodigit_v']}V {strs['prodigit_i']}A {strs['prodigit_p']}W"
+            lines.append(data_line)
+            
+        # Only the newest sample needs to reach the measurement labels,
+        # and only labels whose text actually changed schedule a redraw
+        if latest is not None:
+            for key, label, caption in (
+                    ('sorensen_v', self.sorensen_volt_meas, 'Voltage: %s V'),
+                    ('sorensen_i', self.sorensen_curr_meas, 'Current: %s A'),
+                    ('keithley_v', self.keithley_volt_meas, 'Voltage: %s V'),
+                    ('keithley_i', self.keithley_curr_meas, 'Current: %s A'),
+                    ('prodigit_v', self.prodigit_volt_meas, 'Voltage: %s V'),
+                    ('prodigit_i', self.prodigit_curr_meas, 'Current: %s A'),
+                    ('prodigit_p', self.prodigit_pow_meas, 'Power: %s W')):
+                value = latest[key]
+                if value is None:
+                    continue
+                text = caption % value
+                if self._last_shown.get(key) != text:
+                    label.config(text=text)
+                    self._last_shown[key] = text
                 
-        except queue.Empty:
-            pass
-            
-        # Schedule next update
-        self.root.after(100, self.update_monitoring_display)
+        if lines:
+            self._ring.extend(lines)
+            self.data_display.configure(state='normal')
+            self.data_display.delete('1.0', tk.END)
+            self.data_display.insert('1.0', '\n'.join(self._ring))
+            self.data_display.configure(state='disabled')
+            self.data_display.see(tk.END)
+        
+    def _append_sample(self, data_point):
+        """Append one sample to the channel arrays, doubling when full"""
+        if self._n == self._cap:
+            if self._cap < self._max_samples:
+                self._cap = min(self._cap * 2, self._max_samples)
+                for k, arr in self._ch.items():
+                    grown = _nan_channel(self._cap)
+                    grown[:self._n] = arr
+                    self._ch[k] = grown
+            else:
+                # At the cap: slide the newest half down and keep rolling
+                half = self._n // 2
+                keep = self._n - half
+                for arr in self._ch.values():
+                    arr[:keep] = arr[half:self._n]
+                    arr[keep:] = _nan_channel(self._cap - keep)
+                del self._ts[:half]
+                self._n = keep
+        for k, arr in self._ch.items():
+            value = data_point[k]
+            if value is not None:
+                arr[self._n] = value
+        self._ts.append(data_point['timestamp_ns'])
+        self._n += 1
         
     def save_data(self):
         """Save monitoring data to CSV file"""
-        if not self.monitoring_data:
+        if not self._n:
             messagebox.showwarning("Warning", "No data to save")
             return
             
@@ -1287,25 +1688,55 @@ class DeviceTestGUI:
         
         if filename:
             try:
-                with open(filename, 'w', newline='') as csvfile:
-                    fieldnames = ['timestamp', 'sorensen_v', 'sorensen_i', 
+                # Plain writer + writerows over tuple rows: C-level bulk
+                # write instead of per-row dict re-keying, with a 1 MiB
+                # buffer so long runs don't flush per line
+                with open(filename, 'w', newline='', buffering=1 << 20) as csvfile:
+                    fieldnames = ['timestamp_ns', 'iso_time',
+                                'sorensen_v', 'sorensen_i', 
                                 'keithley_v', 'keithley_i', 
                                 'prodigit_v', 'prodigit_i', 'prodigit_p']
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                    writer = csv.writer(csvfile)
                     
-                    writer.writeheader()
-                    for data_point in self.monitoring_data:
-                        writer.writerow(data_point)
+                    writer.writerow(fieldnames)
+                    # One pass through the contiguous channel arrays; the
+                    # human-readable time column is only built here
+                    n = self._n
+                    fromts = datetime.datetime.fromtimestamp
+                    cols = [self._ch[k][:n] for k in fieldnames[2:]]
+                    writer.writerows(
+                        (self._ts[j],
+                         fromts(self._ts[j] / 1e9).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+                         *('' if math.isnan(c[j]) else f'{c[j]:.6g}' for c in cols))
+                        for j in range(n))
                         
                 messagebox.showinfo("Success", f"Data saved to {filename}")
                 
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save data: {e}")
                 
+    def show_errors(self):
+        """Show the most recent monitoring errors"""
+        if not self._err_deque:
+            messagebox.showinfo("Errors", "No monitoring errors recorded")
+            return
+        lines = [f"{datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')}  {msg}"
+                 for ts, msg in list(self._err_deque)[-20:]]
+        messagebox.showwarning("Monitoring Errors", '\n'.join(lines))
+        
     def clear_data(self):
         """Clear monitoring data"""
-        self.monitoring_data.clear()
+        self._n = 0
+        self._ts.clear()
+        # A sample with a None channel leaves its slot untouched, so the
+        # arrays must go back to NaN or stale pre-clear values would be
+        # exported as real data from reused indices
+        for k in self._ch:
+            self._ch[k] = _nan_channel(self._cap)
+        self._ring.clear()
+        self.data_display.configure(state='normal')
         self.data_display.delete(1.0, tk.END)
+        self.data_display.configure(state='disabled')
         messagebox.showinfo("Success", "Data cleared")
         
     def on_closing(self):
@@ -1313,6 +1744,13 @@ class DeviceTestGUI:
         # Stop monitoring
         self.monitoring = False
         
+        # Release the shared VISA session table
+        if type(self)._rm is not None:
+            try:
+                type(self)._rm.close()
+            except:
+                pass
+        
         # Disconnect all devices
         for device_name, device in self.devices.items():
             if device and device.connected:
@@ -3,7 +3,12 @@
 Keithley 2281S Battery Simulator/Emulator Controller
 Enhanced with reference script patterns from auto_mode_profile.py
 """
+import collections
 import csv
+import os
+import functools
+import math
+import socket
 import time
 import datetime
 import pandas as pd
@@ -22,6 +27,30 @@ class KeithleyController(BaseDeviceController):
         self.current_mode: Optional[str] = None  # Track current mode
         self.logger = KeithleyLogger()  # Structured logging
         self.mode_switch_delay = 3.0  # Delay after mode switch (seconds)
+        # The interface type never changes after construction; the hot
+        # polling loops check this on every send, so resolve it once
+        self._is_ethernet = hasattr(interface, 'host')
+        # Bind the command templates once; going through
+        # self.device_spec.default_commands[...] costs two attribute
+        # lookups plus a dict lookup on every send, which adds up in
+        # the measurement hot paths
+        cmds = self.device_spec.default_commands
+        self._cmd_set_voltage = cmds['set_voltage']
+        self._cmd_set_current = cmds['set_current']
+        self._cmd_output_on = cmds['output_on']
+        self._cmd_output_off = cmds['output_off']
+        self._cmd_battery_test_mode = cmds['battery_test_mode']
+        self._cmd_remote_mode = cmds['remote_mode']
+        self._cmd_local_mode = cmds['local_mode']
+        self._cmd_measure_voltage = cmds['measure_voltage']
+        self._cmd_measure_current = cmds['measure_current']
+        self._cmd_battery_data_buffer = cmds['battery_data_buffer']
+        # (mode, value) of the last current limit actually sent, so
+        # re-applying the same setpoint can be skipped
+        self._confirmed_current_limit = None
+        # Rolling window of recent query round-trip times; adaptive_step
+        # derives the poll cadence from it
+        self._rtts = collections.deque(maxlen=8)
         
     def set_voltage(self, voltage: float):
         """Set output voltage in volts - mode dependent"""
@@ -38,14 +67,20 @@ class KeithleyController(BaseDeviceController):
             print("Note: In Battery Test mode, current control is primary")
         else:
             # Power Supply mode
-            cmd = self.device_spec.default_commands['set_voltage'].format(voltage)
-            self.send_command(cmd)
+            self.send_command(self._cmd_set_voltage.format(voltage))
         
     def set_current_limit(self, current: float):
         """Set current limit in amperes - mode dependent"""
         if current < 0 or current > self.device_spec.max_current:
             raise ValueError(f"Current must be between 0 and {self.device_spec.max_current}A")
 
+        # The limit only needs re-sending when it actually changes
+        # (or the mode did, since the command differs per mode)
+        confirmed = self._confirmed_current_limit
+        if confirmed is not None and confirmed[0] == self.current_mode \
+                and math.isclose(confirmed[1], current):
+            return
+
         # Use different commands based on current mode
         if self.current_mode == 'test':
             # In Battery Test mode, set I-Limit parameter
@@ -53,8 +88,8 @@ class KeithleyController(BaseDeviceController):
             self.send_command(f':BATT:TEST:SENS:AH:ILIM {current}')
         else:
             # Power Supply mode
-            cmd = self.device_spec.default_commands['set_current'].format(current)
-            self.send_command(cmd)
+            self.send_command(self._cmd_set_current.format(current))
+        self._confirmed_current_limit = (self.current_mode, current)
         
     def output_on(self):
         """Turn output on - mode dependent"""
@@ -64,8 +99,7 @@ class KeithleyController(BaseDeviceController):
             self.send_command(':BATT:OUTP ON')
         else:
             # Power Supply mode
-            cmd = self.device_spec.default_commands['output_on']
-            self.send_command(cmd)
+            self.send_command(self._cmd_output_on)
         
     def output_off(self):
         """Turn output off - mode dependent"""
@@ -75,23 +109,19 @@ class KeithleyController(BaseDeviceController):
             self.send_command(':BATT:OUTP OFF')
         else:
             # Power Supply mode
-            cmd = self.device_spec.default_commands['output_off']
-            self.send_command(cmd)
+            self.send_command(self._cmd_output_off)
         
     def battery_test_mode(self):
         """Switch to battery test function"""
-        cmd = self.device_spec.default_commands['battery_test_mode']
-        self.send_command(cmd)
+        self.send_command(self._cmd_battery_test_mode)
         
     def remote_mode(self):
         """Set device to remote mode"""
-        cmd = self.device_spec.default_commands['remote_mode']
-        self.send_command(cmd)
+        self.send_command(self._cmd_remote_mode)
         
     def local_mode(self):
         """Set device to local mode"""
-        cmd = self.device_spec.default_commands['local_mode']
-        self.send_command(cmd)
+        self.send_command(self._cmd_local_mode)
     
     def switch_to_power_supply_mode(self) -> bool:
         """
@@ -228,35 +258,111 @@ class KeithleyController(BaseDeviceController):
                 print("Connecting to instrument...")
                 # Connection is handled by base class, just verify
                 if hasattr(self.interface, 'connection'):
+                    self._tune_socket()
+                    self._tune_visa()
+                    # A fresh connection invalidates anything memoized
+                    # from a previous one
+                    self.__dict__.pop('device_idn', None)
+                    self._confirmed_current_limit = None
                     # Clear any pending data
                     self.send_command(self.device_spec.default_commands['clear'])
                     
                     # Test basic communication
-                    idn_response = self.query_command(self.device_spec.default_commands['identify'])
-                    print(f"Connected: {idn_response.strip()}")
+                    print(f"Connected: {self.device_idn.strip()}")
                     return True
             return True
         except Exception as e:
             print(f"Connection Failed: {e}")
             return False
     
+    def query_command(self, command: str) -> str:
+        """Query the device, recording the round-trip time"""
+        t0 = time.perf_counter()
+        response = super().query_command(command)
+        self._rtts.append(time.perf_counter() - t0)
+        return response
+    
+    def adaptive_step(self, floor: float = 0.05, fallback: float = 0.5) -> float:
+        """Poll interval matched to the measured channel speed.
+        
+        Twice the rolling-average query RTT, floored: fast USB links
+        get a denser sample cadence than the fixed worst-case step,
+        while slow Ethernet links are never polled faster than they
+        can answer.
+        """
+        if not self._rtts:
+            return fallback
+        return max(floor, 2 * sum(self._rtts) / len(self._rtts))
+    
+    @functools.cached_property
+    def device_idn(self) -> str:
+        """Identification string from *IDN? - immutable for the life
+        of a connection, so query it once and reuse"""
+        return self.query_command(self.device_spec.default_commands.get('identify', '*IDN?'))
+    
     def is_ethernet_connection(self):
         """Check if using ethernet connection"""
-        return hasattr(self.interface, 'host')
+        return self._is_ethernet
+    
+    def _tune_socket(self):
+        """Lower latency on raw TCP connections.
+        
+        Nagle's algorithm coalesces small SCPI writes and delayed ACKs
+        inflate round trips; TCP_NODELAY and (on Linux) TCP_QUICKACK
+        make small command/response exchanges go out immediately.
+        """
+        if not self._is_ethernet:
+            return
+        sock = getattr(self.interface, 'connection', None)
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except:
+            pass
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        except (AttributeError, OSError):
+            pass  # TCP_QUICKACK is Linux-only
+    
+    def _tune_visa(self):
+        """Raise the pyvisa transfer chunk size.
+        
+        The default chunk size fragments a battery-buffer readout into
+        many low-level reads; one chunk large enough for a full buffer
+        response lets each query complete in a single read.
+        """
+        conn = getattr(self.interface, 'connection', None)
+        if conn is None or not hasattr(conn, 'chunk_size'):
+            return
+        try:
+            conn.chunk_size = 102400
+        except:
+            pass
     
     def send_command_with_delay(self, command, delay=None):
         """Send command with appropriate delay for connection type"""
         self.send_command(command)
         if delay is None:
-            delay = 0.1 if self.is_ethernet_connection() else 0.01
+            # With Nagle disabled the write hits the wire immediately,
+            # so the Ethernet pad no longer needs to absorb ~40ms of
+            # coalescing delay
+            delay = 0.005 if self._is_ethernet else 0.01
         if delay > 0:
             time.sleep(delay)
         
+    def send_batch(self, commands):
+        """Send several commands as one ';'-joined SCPI compound write.
+        
+        Each send_command is a full round trip (plus the per-command delay
+        on Ethernet); a compound command pays that cost once per group.
+        """
+        self.send_command(';'.join(commands))
+        
     def measure_voltage(self) -> Optional[float]:
         """Read actual output voltage"""
         try:
-            cmd = self.device_spec.default_commands['measure_voltage']
-            response = self.query_command(cmd)
+            response = self.query_command(self._cmd_measure_voltage)
             return float(response)
         except:
             return None
@@ -264,8 +370,7 @@ class KeithleyController(BaseDeviceController):
     def measure_current(self) -> Optional[float]:
         """Read actual output current"""
         try:
-            cmd = self.device_spec.default_commands['measure_current']
-            response = self.query_command(cmd)
+            response = self.query_command(self._cmd_measure_current)
             return float(response)
         except:
             return None
@@ -307,36 +412,59 @@ class KeithleyController(BaseDeviceController):
             except:
                 return None, None
     
+    def _widen_timeout(self, eth_seconds: float, visa_ms: int):
+        """Set the connection timeout and return the previous value.
+        
+        Handles both raw socket (settimeout, seconds) and VISA
+        (.timeout, milliseconds) connections; callers restore once via
+        _restore_timeout rather than wrapping every read.
+        """
+        conn = self.interface.connection
+        if self._is_ethernet and hasattr(conn, 'settimeout'):
+            previous = getattr(conn, 'timeout', None)
+            conn.settimeout(eth_seconds)
+            return previous
+        if hasattr(conn, 'timeout'):
+            previous = getattr(conn, 'timeout', 5000)
+            conn.timeout = visa_ms
+            return previous
+        return None
+    
+    def _restore_timeout(self, previous):
+        """Put back a timeout saved by _widen_timeout"""
+        try:
+            conn = self.interface.connection
+            if self._is_ethernet and hasattr(conn, 'settimeout'):
+                conn.settimeout(previous)
+            elif hasattr(conn, 'timeout'):
+                conn.timeout = previous
+        except:
+            pass
+    
     def measure_battery_data_buffer(self) -> Tuple[Optional[float], Optional[float], Optional[float]]:
         """
         Get last voltage, current and relative time from device buffer
         Based on reference script pattern
         Returns (voltage, current, rel_time) tuple
         """
+        # Widen the timeout once and restore once in the finally below,
+        # instead of a save/restore pair around every return path
+        original_timeout = self._widen_timeout(15.0, 5000)
         try:
-            # Store original timeout - handle both socket and VISA connections
-            is_ethernet = self.is_ethernet_connection()
+            is_ethernet = self._is_ethernet
             if is_ethernet:
-                original_timeout = getattr(self.interface.connection, 'timeout', None)
-                if hasattr(self.interface.connection, 'settimeout'):
-                    self.interface.connection.settimeout(15.0)  # 15 second timeout for Ethernet
                 time.sleep(0.1)  # Delay for ethernet
-            else:
-                original_timeout = getattr(self.interface.connection, 'timeout', 5000)
-                if hasattr(self.interface.connection, 'timeout'):
-                    self.interface.connection.timeout = 5000  # 5 second timeout for USB
             
             # Try buffer method first
-            buf = self.query_command(self.device_spec.default_commands['battery_data_buffer'])
+            buf = self.query_command(self._cmd_battery_data_buffer)
             
-            if buf and len(buf.split(',')) >= 3:
-                vals = list(map(float, buf.split(',')[-3:]))
-                # Restore original timeout
-                if is_ethernet and hasattr(self.interface.connection, 'settimeout'):
-                    self.interface.connection.settimeout(original_timeout)
-                elif hasattr(self.interface.connection, 'timeout'):
-                    self.interface.connection.timeout = original_timeout
-                return vals[0], vals[1], vals[2]
+            # Only the last three fields matter; rsplit splits just the
+            # tail instead of materializing every field of a buffer that
+            # grows as the test runs
+            if buf:
+                parts = buf.rsplit(',', 3)[-3:]
+                if len(parts) == 3:
+                    return float(parts[0]), float(parts[1]), float(parts[2])
             
             # If buffer fails, try direct measurement with retries
             for retry in range(5):  # More retries
@@ -344,21 +472,16 @@ class KeithleyController(BaseDeviceController):
                     if is_ethernet:
                         time.sleep(0.2)  # Longer delay for ethernet
                     
-                    volt_response = self.query_command(self.device_spec.default_commands['measure_voltage'])
+                    volt_response = self.query_command(self._cmd_measure_voltage)
                     if is_ethernet:
                         time.sleep(0.1)  # Additional delay between commands
-                    curr_response = self.query_command(self.device_spec.default_commands['measure_current'])
+                    curr_response = self.query_command(self._cmd_measure_current)
                     
                     if volt_response and curr_response:
                         try:
                             voltage = float(volt_response.strip())
                             current = float(curr_response.strip())
                             rel_time = time.time()  # Current time as fallback
-                            # Restore original timeout
-                            if is_ethernet and hasattr(self.interface.connection, 'settimeout'):
-                                self.interface.connection.settimeout(original_timeout)
-                            elif hasattr(self.interface.connection, 'timeout'):
-                                self.interface.connection.timeout = original_timeout
                             return voltage, current, rel_time
                         except ValueError as ve:
                             print(f'Could not parse measurement data: V="{volt_response}" I="{curr_response}"')
@@ -371,24 +494,106 @@ class KeithleyController(BaseDeviceController):
                     else:
                         print(f'Direct measurement failed after 5 retries: {e}')
             
-            # Restore original timeout
-            if is_ethernet and hasattr(self.interface.connection, 'settimeout'):
-                self.interface.connection.settimeout(original_timeout)
-            elif hasattr(self.interface.connection, 'timeout'):
-                self.interface.connection.timeout = original_timeout
             return None, None, None
             
         except Exception as e:
             print(f'Exception in measure_battery_data_buffer(): {e}')
-            try:
-                if is_ethernet and hasattr(self.interface.connection, 'settimeout'):
-                    self.interface.connection.settimeout(original_timeout)
-                elif hasattr(self.interface.connection, 'timeout'):
-                    self.interface.connection.timeout = original_timeout
-            except:
-                pass
             return None, None, None
+        finally:
+            self._restore_timeout(original_timeout)
             
+    def drain_buffer(self, start_index: int) -> List[Tuple[float, float, float]]:
+        """
+        Fetch every sample the data logger accumulated past start_index.
+        
+        The instrument samples on its own at :BATT:TEST:SENS:SAMP:INT
+        rate; rather than polling the buffer tail every step,
+        one :BATT:DATA:POIN? plus one :BATT:DATA:DATA? fetches the
+        whole phase in a single round trip.
+        
+        Returns a list of (voltage, current, rel_time) triplets.
+        """
+        try:
+            points = int(float(self.query_command(':BATT:DATA:POIN?')))
+        except Exception as e:
+            print(f'Could not query buffer point count: {e}')
+            return []
+        if points <= start_index:
+            return []
+        
+        try:
+            buf = self.query_command(':BATT:DATA:DATA? "VOLT,CURR,REL"')
+        except Exception as e:
+            print(f'Buffer drain failed: {e}')
+            return []
+        if not buf or not buf.strip():
+            return []
+        
+        try:
+            flat = [float(x) for x in buf.split(',')]
+        except ValueError:
+            print(f'Could not parse buffer data: "{buf[:80]}..."')
+            return []
+        
+        # Values come back flat as v,i,rel triplets; keep only the
+        # samples recorded after start_index
+        samples = [tuple(flat[i:i + 3]) for i in range(0, len(flat) - 2, 3)]
+        return samples[start_index:]
+    
+    def _last_vi(self, debug: bool = False) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """Read the newest (voltage, current, rel_time) from the data
+        buffer - simple buffer read exactly like working script, works
+        for both USB and Ethernet"""
+        try:
+            buf = self.query_command(':BATT:DATA:DATA? "VOLT,CURR,REL"')
+            if debug:
+                print(f'[DEBUG] Buffer response length: {len(buf) if buf else 0}')
+                if buf:
+                    print(f'[DEBUG] Buffer response: "{buf[:200]}..."' if len(buf) > 200 else f'[DEBUG] Buffer response: "{buf}"')
+                else:
+                    print('[DEBUG] Buffer response: empty string')
+            
+            if not buf or buf.strip() == '':  # empty string or whitespace only
+                return None, None, None
+                
+            # Split off just the last three values; the buffer grows
+            # over the phase and a full split is O(all samples so far)
+            parts = buf.rsplit(',', 3)[-3:]
+            if len(parts) < 3:
+                if debug:
+                    print(f'[DEBUG] Not enough data parts: {len(parts)}')
+                return None, None, None
+                
+            return float(parts[0]), float(parts[1]), float(parts[2])
+        except Exception as e:
+            if debug:
+                print(f'[DEBUG] last_vi() exception: {e}')
+            return None, None, None
+    
+    def _poll_until(self, duration: float, step: float, fn):
+        """Call fn at a fixed step cadence for duration seconds.
+        
+        Ticks are absolute offsets on the monotonic clock, so the
+        cadence does not drift with fn's runtime and is immune to
+        wall-clock jumps, unlike a plain while time.time() < end loop.
+        """
+        start = time.monotonic()
+        deadline = start + duration
+        next_tick = start + step
+        while time.monotonic() < deadline:
+            fn()
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_tick += step
+    
+    def buffer_point_count(self) -> int:
+        """Number of samples currently in the battery data buffer"""
+        try:
+            return int(float(self.query_command(':BATT:DATA:POIN?')))
+        except:
+            return 0
+    
     def measure_power(self) -> Optional[float]:
         """Calculate power from voltage and current"""
         try:
@@ -484,7 +689,7 @@ class KeithleyController(BaseDeviceController):
             raise Exception("Device not connected")
         
         # Check for Ethernet connection and prevent test run
-        if self.is_ethernet_connection():
+        if self._is_ethernet:
             raise Exception(
                 "Pulse test data logging is not supported over Ethernet due to instrument limitations. "
                 "Please use a USB connection for this test."
@@ -510,40 +715,37 @@ class KeithleyController(BaseDeviceController):
             # Test parameters - simplified for Keithley 2281S Battery Test mode
             # Note: Keithley 2281S can only discharge at ~1A, no variable discharge current
             I_PULSE, I_REST = i_pulse, i_rest
-            # Use same timing as working script for all connections
-            STEP = 0.5
             EVOC_DLY = 0.05
             
             # Determine if ethernet connection
-            is_ethernet = self.is_ethernet_connection()
+            is_ethernet = self._is_ethernet
             
             # Initialize device with ethernet-specific timeouts
             try:
                 print("Initializing Keithley for pulse test...")
                 print(f"Connection type: {'Ethernet' if is_ethernet else 'USB/GPIB'}")
                 
-                # Set timeout like working script (5 seconds = 5000ms)
-                if is_ethernet and hasattr(self.interface.connection, 'settimeout'):
-                    self.interface.connection.settimeout(5.0)  # 5 second timeout like working script
-                    print("Set ethernet timeout to 5 seconds like working script")
-                elif hasattr(self.interface.connection, 'timeout'):
-                    self.interface.connection.timeout = 5000  # 5000ms for VISA connections
-                    print("Set VISA timeout to 5000ms like working script")
+                # Set timeout like working script (5 seconds = 5000ms),
+                # once for the whole test; restored in the finally below
+                self._saved_timeout = self._widen_timeout(5.0, 5000)
+                print("Set timeout to 5 seconds like working script")
                 
-                # Exact initialization sequence from working script
-                self.send_command('*CLS')
-                self.send_command('SYST:REM')
-                self.send_command(':FUNC TEST')
-                self.send_command(':BATT:TEST:MODE DIS')
-                self.send_command(f':BATT:TEST:SENS:SAMP:INT {sample_interval}')
-                self.send_command(f':BATT:TEST:SENS:EVOC:DELA {EVOC_DLY}')
-                self.send_command(':FORM:UNITS OFF')
-                self.send_command(':SYST:AZER OFF')
+                # Exact initialization sequence from working script,
+                # batched into one compound write per logical group
+                self.send_batch([
+                    '*CLS',
+                    'SYST:REM',
+                    ':FUNC TEST',
+                    ':BATT:TEST:MODE DIS',
+                    f':BATT:TEST:SENS:SAMP:INT {sample_interval}',
+                    f':BATT:TEST:SENS:EVOC:DELA {EVOC_DLY}',
+                    ':FORM:UNITS OFF',
+                    ':SYST:AZER OFF',
+                ])
                 
                 # Data logger setup exactly like working script
-                self.send_command(':BATT:DATA:CLE')
-                self.send_command(':BATT:DATA:STAT ON')
-                self.send_command(':BATT:TEST:EXEC STAR')
+                self.send_batch([':BATT:DATA:CLE', ':BATT:DATA:STAT ON',
+                                 ':BATT:TEST:EXEC STAR'])
                 
                 # Add delay like working script has between init and pulse start
                 time.sleep(1.0)  # Allow data logger to initialize properly
@@ -573,83 +775,81 @@ class KeithleyController(BaseDeviceController):
             print(f"Creating output files in logs directory: {pulse_file.name}, {rest_file.name}")
             
             try:
-                with open(pulse_file, 'w', newline='') as fpulse, \
-                     open(rest_file, 'w', newline='') as frest:
+                # A 1 MiB userspace buffer keeps row writes out of the
+                # kernel entirely; data hits disk at phase boundaries,
+                # where an explicit flush + fsync makes it crash-safe
+                with open(pulse_file, 'w', newline='', buffering=1 << 20) as fpulse, \
+                     open(rest_file, 'w', newline='', buffering=1 << 20) as frest:
                     
                     wp = csv.writer(fpulse)
                     wr = csv.writer(frest)
                     wp.writerow(['t_rel_s', 'volt_v', 'curr_a'])
                     wr.writerow(['t_rel_s', 'voc_v', 'esr_ohm'])
-                    fpulse.flush()
-                    frest.flush()
                     
                     t0 = time.time()
                     print(f"Starting pulse test: {pulses} pulses...")
                     
-                    def last_vi():
-                        """Simple buffer read exactly like working script - works for both USB and Ethernet"""
-                        try:
-                            buf = self.query_command(':BATT:DATA:DATA? "VOLT,CURR,REL"')
-                            # Enhanced debug output for ethernet connections
-                            if is_ethernet and (cyc <= 2):  # Show debug for first two pulses
-                                print(f'[DEBUG] Buffer response length: {len(buf) if buf else 0}')
-                                if buf:
-                                    print(f'[DEBUG] Buffer response: "{buf[:200]}..."' if len(buf) > 200 else f'[DEBUG] Buffer response: "{buf}"')
-                                else:
-                                    print('[DEBUG] Buffer response: empty string')
-                            
-                            if not buf or buf.strip() == '':  # empty string or whitespace only
-                                return None, None, None
-                                
-                            # Split and get last three values
-                            parts = buf.split(',')
-                            if len(parts) < 3:
-                                if is_ethernet and (cyc <= 2):
-                                    print(f'[DEBUG] Not enough data parts: {len(parts)}')
-                                return None, None, None
-                                
-                            vals = list(map(float, parts[-3:]))  # last three numbers
-                            v, i, rel = vals
-                            return v, i, rel
-                        except Exception as e:
-                            if is_ethernet and (cyc <= 2):  # Show debug for first two pulses
-                                print(f'[DEBUG] last_vi() exception: {e}')
-                            return None, None, None
+                    # The setpoints never change between cycles; format
+                    # the command strings once instead of per pulse
+                    pulse_on_cmds = [f':BATT:TEST:CURR:LIM:SOUR {I_PULSE}',
+                                     ':BATT:OUTP ON']
+                    rest_off_cmds = [':BATT:OUTP OFF',
+                                     f':BATT:TEST:CURR:LIM:SOUR {I_REST}']
                     
                     for cyc in range(1, pulses + 1):
                         print(f"Executing pulse {cyc}/{pulses}...")
                         
                         # PULSE - Direct on/off for Keithley 2281S Battery Test mode
-                        # Set discharge current and turn on output
-                        self.send_command(f':BATT:TEST:CURR:LIM:SOUR {I_PULSE}')
-                        self.send_command(':BATT:OUTP ON')
+                        # Set discharge current and turn on output in one write
+                        self.send_batch(pulse_on_cmds)
                         
                         # Give buffer time to start collecting data after output is turned on
                         time.sleep(0.5)
                         
                         print(f'>>> {cyc}. PULSE — {pulse_time}s @ ~1A (Battery Test mode)')
-                        end = time.time() + pulse_time
-                        while time.time() < end:
-                            v, i, rel = last_vi()
-                            if v is not None: 
+                        # The instrument samples at sample_interval on its
+                        # own; sleep through the phase, then pull every new
+                        # buffer row in one readout instead of polling the
+                        # tail every sample step
+                        drain_from = self.buffer_point_count()
+                        time.sleep(pulse_time)
+                        samples = self.drain_buffer(drain_from)
+                        if samples:
+                            wp.writerows([f'{rel:.3f}', f'{v:.6f}', f'{i:.6f}']
+                                         for v, i, rel in samples)
+                        else:
+                            # Fall back to one tail read so the phase still
+                            # leaves a data point (debug for first pulses
+                            # on ethernet)
+                            v, i, rel = self._last_vi(debug=is_ethernet and cyc <= 2)
+                            if v is not None:
                                 wp.writerow([f'{rel:.3f}', f'{v:.6f}', f'{i:.6f}'])
-                                fpulse.flush()
-                            time.sleep(STEP)
+                        fpulse.flush()
+                        os.fsync(fpulse.fileno())
                         
                         # REST + EVOC exactly like working script
-                        self.send_command(':BATT:OUTP OFF')
-                        self.send_command(f':BATT:TEST:CURR:LIM:SOUR {I_REST}')
+                        self.send_batch(rest_off_cmds)
                         print(f'>>> Dinlenme — {rest_time}s')
-                        end = time.time() + rest_time
-                        while time.time() < end:
+                        # Buffer rows in memory during the phase; one
+                        # writerows + flush at the phase boundary instead
+                        # of a write syscall per sample
+                        rest_rows = []
+                        
+                        def sample_evoc():
                             try:
                                 evoc_response = self.query_command(':BATT:TEST:MEAS:EVOC?')
                                 esr, voc = map(float, evoc_response.split(','))
-                                wr.writerow([f'{time.time()-t0:.3f}', f'{voc:.6f}', f'{esr:.6f}'])
-                                frest.flush()
+                                rest_rows.append([f'{time.time()-t0:.3f}', f'{voc:.6f}', f'{esr:.6f}'])
                             except Exception as e:
                                 print(f'EVOC measurement failed: {e}')
-                            time.sleep(STEP)
+                        
+                        # Pace the EVOC sampling to the measured query
+                        # RTT rather than a fixed worst-case 0.5s step
+                        self._poll_until(rest_time, self.adaptive_step(), sample_evoc)
+                        if rest_rows:
+                            wr.writerows(rest_rows)
+                            frest.flush()
+                            os.fsync(frest.fileno())
                     
                     print("Pulse test completed successfully")
                     print(f"Data saved to: {pulse_file}")
@@ -670,6 +870,11 @@ class KeithleyController(BaseDeviceController):
             # Always clear busy state
             self.set_busy(False)
             
+            # Put back the timeout that was widened for the test
+            if hasattr(self, '_saved_timeout'):
+                self._restore_timeout(self._saved_timeout)
+                del self._saved_timeout
+            
             # Clean up device state - only turn off output, keep connection
             try:
                 self.send_command(':BATT:OUTP OFF')
@@ -754,19 +959,17 @@ class KeithleyController(BaseDeviceController):
             
             # 1) Clear and initialize
             print("Clearing buffers and initializing...")
-            self.send_command('*CLS')
-            self.send_command(':BATT1:DATA:CLE')
-            self.send_command(':BATT:DATA:CLE')
-            self.send_command(':TRACe:CLEar')
+            self.send_batch(['*CLS', ':BATT1:DATA:CLE', ':BATT:DATA:CLE',
+                             ':TRACe:CLEar'])
             
             # 2) Discharge phase
             print("=== STARTING BATTERY DISCHARGE ===")
             print(f"Discharge to {discharge_voltage}V, end current {discharge_current_end}A")
             
-            self.send_command(':BATT:TEST:MODE DIS')
-            self.send_command(f':BATT:TEST:VOLT {discharge_voltage}')
-            self.send_command(f':BATT:TEST:CURR:END {discharge_current_end}')
-            self.send_command(':BATT:OUTP ON')
+            self.send_batch([':BATT:TEST:MODE DIS',
+                             f':BATT:TEST:VOLT {discharge_voltage}',
+                             f':BATT:TEST:CURR:END {discharge_current_end}',
+                             ':BATT:OUTP ON'])
             
             # Wait for discharge to complete (no timeout - wait until finished)
             start_time = time.time()
@@ -774,13 +977,17 @@ class KeithleyController(BaseDeviceController):
             while True:
                 # Check measurement status
                 try:
-                    cond = int(self.query_command(':STAT:OPER:INST:ISUM:COND?'))
+                    # Status, voltage and current in one compound query:
+                    # one round trip per check instead of three
+                    reply = self.query_command(':STAT:OPER:INST:ISUM:COND?;:BATT:VOLT?;:BATT:CURR?')
+                    parts = reply.split(';')
+                    cond = int(parts[0])
                     measuring = bool(cond & 0x10)
 
                     # Try to get voltage/current
                     try:
-                        voltage = float(self.query_command(':BATT:VOLT?'))
-                        current = float(self.query_command(':BATT:CURR?'))
+                        voltage = float(parts[1])
+                        current = float(parts[2])
                         elapsed = time.time() - start_time
                         print(f"Discharge progress: {elapsed/60:.1f} min | V: {voltage:.3f}V | I: {current:.3f}A")
                     except:
@@ -803,28 +1010,31 @@ class KeithleyController(BaseDeviceController):
             print("=== STARTING CHARGE & CHARACTERIZATION ===")
             print(f"Charge to {charge_vfull}V, current limit {charge_ilimit}A, ESR interval {esr_interval}s")
             
-            self.send_command(f':BATT:TEST:SENS:AH:VFUL {charge_vfull}')
-            self.send_command(f':BATT:TEST:SENS:AH:ILIM {charge_ilimit}')
-            self.send_command(f':BATT:TEST:SENS:AH:ESRI S{esr_interval}')
-            self.send_command(':TRACe:CLEar:AUTO ON')
-            self.send_command(':TRACe:FEED:CONT ALW')
+            self.send_batch([f':BATT:TEST:SENS:AH:VFUL {charge_vfull}',
+                             f':BATT:TEST:SENS:AH:ILIM {charge_ilimit}',
+                             f':BATT:TEST:SENS:AH:ESRI S{esr_interval}',
+                             ':TRACe:CLEar:AUTO ON',
+                             ':TRACe:FEED:CONT ALW'])
             
             # Start A-H measurement
-            self.send_command(':BATT:OUTP ON')
-            self.send_command(':BATT:TEST:SENS:AH:EXEC STAR')
+            self.send_batch([':BATT:OUTP ON', ':BATT:TEST:SENS:AH:EXEC STAR'])
             
             # Wait for charge to complete (no timeout - wait until finished)
             start_time = time.time()
 
             while True:
                 try:
-                    cond = int(self.query_command(':STAT:OPER:INST:ISUM:COND?'))
+                    # Status, voltage and current in one compound query:
+                    # one round trip per check instead of three
+                    reply = self.query_command(':STAT:OPER:INST:ISUM:COND?;:BATT:VOLT?;:BATT:CURR?')
+                    parts = reply.split(';')
+                    cond = int(parts[0])
                     measuring = bool(cond & 0x10)
 
                     # Try to get voltage/current
                     try:
-                        voltage = float(self.query_command(':BATT:VOLT?'))
-                        current = float(self.query_command(':BATT:CURR?'))
+                        voltage = float(parts[1])
+                        current = float(parts[2])
                         elapsed = time.time() - start_time
                         print(f"Charge progress: {elapsed/60:.1f} min | V: {voltage:.3f}V | I: {current:.3f}A")
                     except:
@@ -844,8 +1054,8 @@ class KeithleyController(BaseDeviceController):
             
             # 4) Generate and save model
             print("=== GENERATING BATTERY MODEL ===")
-            self.send_command(f':BATT:TEST:SENS:AH:GMOD:RANG {v_min},{v_max}')
-            self.send_command(f':BATT:TEST:SENS:AH:GMOD:SAVE:INT {model_slot}')
+            self.send_batch([f':BATT:TEST:SENS:AH:GMOD:RANG {v_min},{v_max}',
+                             f':BATT:TEST:SENS:AH:GMOD:SAVE:INT {model_slot}'])
             
             # Wait for model generation
             time.sleep(2)
@@ -1217,7 +1427,7 @@ class KeithleyController(BaseDeviceController):
             raise Exception(error_msg)
 
         # Check for Ethernet connection and prevent test run
-        if self.is_ethernet_connection():
+        if self._is_ethernet:
             raise Exception(
                 "Current profile execution is not supported over Ethernet due to discharge measurement limitations. "
                 "Please use a USB connection for this test."
@@ -1226,7 +1436,7 @@ class KeithleyController(BaseDeviceController):
         # Test basic communication before starting
         print("Testing device communication...")
         try:
-            idn = self.query_command('*IDN?')
+            idn = self.device_idn
             if idn:
                 print(f"Device responds: {idn.strip()[:50]}...")
             else:
@@ -7,6 +7,11 @@ Test different command formats and check load status
 from prodigit_final import Prodigit34205A
 import time
 
+def get_measurements_fast(load):
+    """Read V, I and P with one compound query instead of three round trips"""
+    reply = load.query('MEAS:VOLT?;:MEAS:CURR?;:MEAS:POW?')
+    return tuple(float(x) for x in reply.split(';'))
+
 def debug_current_reading():
     print("=== DEBUG CURRENT READING ===")
     
@@ -30,14 +35,14 @@ def debug_current_reading():
         print(f"   Load enabled status: {enabled}")
         
         print("\n4. Take Measurements:")
-        v, i, p = load.get_measurements()
+        v, i, p = get_measurements_fast(load)
         print(f"   Measurements: {v:.3f}V, {i:.3f}A, {p:.3f}W")
         
         print("\n5. Try Different Current Values:")
         for curr in [0.5, 2.0, 3.0]:
             load.set_current(curr)
             time.sleep(0.5)
-            v, i, p = load.get_measurements()
+            v, i, p = get_measurements_fast(load)
             print(f"   {curr}A set -> {v:.3f}V, {i:.3f}A, {p:.3f}W")
         
         print("\n6. Check Error Code:")
@@ -52,7 +57,7 @@ def debug_current_reading():
         print(f"   LOAD? response: '{load_status}'")
         
         print("\n8. Final Measurements:")
-        v, i, p = load.get_measurements()
+        v, i, p = get_measurements_fast(load)
         print(f"   Final: {v:.3f}V, {i:.3f}A, {p:.3f}W")
         
     finally:
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Shared SCPI electronic-load primitives for the 9V test scripts.
+
+Holds the serial transport, command batching, completion handshake,
+static-query cache and state shadow so every performance fix lands in
+one place instead of once per test class.
+"""
+
+import json
+import re
+import serial
+import threading
+import time
+
+class ScpiLoad:
+    # Replies to these queries describe static device configuration and
+    # are safe to cache between mutating writes
+    _STATIC_QUERIES = frozenset(['SENS?', 'PRES?', 'DYN?', 'SHOR?', 'PROT?', 'NG?'])
+    
+    # Compiled once: pulls the three numeric fields out of a compound
+    # measurement reply without intermediate list allocations
+    _MEAS_RE = re.compile(r'([-+\d.eE]+);([-+\d.eE]+);([-+\d.eE]+)')
+    
+    # Settings whose last committed value is shadowed so repeat writes
+    # can be skipped without touching the bus
+    _TRACKED = frozenset(['MODE', 'LOAD', 'CURR', 'VOLT', 'POW'])
+    
+    # Constant commands pre-encoded once at class load; send() falls
+    # back to encoding for dynamic ones like 'CURR 0.5'
+    _CMD = {name: (name + '\r\n').encode() for name in (
+        'LOAD OFF', 'LOAD ON', 'MODE CC', 'MODE CV', 'MODE CP',
+        'MEAS:VOLT?', 'MEAS:CURR?', 'MEAS:POW?', 'MODE?', 'LOAD?', 'ERR?')}
+    
+    def __init__(self, port='/dev/ttyUSB0'):
+        self.ser = serial.Serial(
+            port=port, baudrate=115200, bytesize=8, 
+            parity='N', stopbits=1, timeout=0.2,  # bounds a missing reply at 200 ms, not 2 s
+            xonxoff=False, rtscts=False, dsrdtr=False
+        )
+        # FTDI adapters buffer replies for up to 16 ms by default;
+        # low-latency mode sets the same ASYNC_LOW_LATENCY ioctl flag
+        # the kernel exposes and cuts that to ~1 ms where supported
+        try:
+            self.ser.set_low_latency_mode(True)
+        except (IOError, OSError, NotImplementedError):
+            pass
+        time.sleep(1)
+        self.ser.flushInput()
+        self.ser.flushOutput()
+        self._cfg_cache = {}
+        self._state = {}
+        self._samples = []
+        # One command/reply exchange at a time on the shared bus; RLock
+        # because query() goes through send()
+        self._bus = threading.RLock()
+        # Drive the load to a known state once; from here the shadow
+        # skips every leading per-iteration LOAD OFF that is already true
+        self.send('LOAD OFF')
+        
+    def _is_redundant(self, cmd):
+        key, _, value = cmd.partition(' ')
+        return bool(value) and key in self._TRACKED and self._state.get(key) == value
+    
+    def _commit(self, cmd):
+        key, _, value = cmd.partition(' ')
+        if value and key in self._TRACKED:
+            self._state[key] = value
+    
+    def send(self, cmd):
+        # flush() drains the OS transmit buffer; no fixed sleep is
+        # charged per command — callers add settling time only where
+        # the hardware actually needs it
+        if self._is_redundant(cmd):
+            return  # shadow says the device is already in this state
+        with self._bus:
+            self.ser.write(self._CMD.get(cmd) or (cmd + '\r\n').encode())
+            self.ser.flush()
+            if not cmd.endswith('?'):
+                # Any mutating write may change what the static queries report
+                self._cfg_cache.clear()
+            self._commit(cmd)
+        
+    def query(self, cmd):
+        if cmd in self._cfg_cache:
+            return self._cfg_cache[cmd]
+        with self._bus:
+            self.send(cmd)
+            # The serial timeout bounds this read; the reply terminator,
+            # not a timer, decides when it returns
+            resp = self.ser.read_until(b'\n', size=128).decode().strip()
+        if all(part.lstrip(':') in self._STATIC_QUERIES for part in cmd.split(';')):
+            self._cfg_cache[cmd] = resp
+        return resp
+    
+    def send_many(self, cmds):
+        # SCPI allows ';'-chaining, so a whole setup sequence goes out
+        # as one UART write instead of one write (and sleep) per command
+        cmds = [c for c in cmds if not self._is_redundant(c)]
+        if not cmds:
+            return
+        with self._bus:
+            self.ser.write(('; '.join(cmds) + '\r\n').encode())
+            self.ser.flush()
+            self._cfg_cache.clear()
+            for c in cmds:
+                self._commit(c)
+    
+    def _settle(self, seconds):
+        # Single choke point for settling waits: an event-loop port
+        # (pyserial-asyncio) only has to override this one method
+        time.sleep(seconds)
+    
+    def _sync(self):
+        # *OPC? replies only once pending commands have fully applied,
+        # so the wait costs device-actual time instead of a guessed delay
+        with self._bus:
+            self.ser.write(b'*OPC?\r\n')
+            self.ser.flush()
+            self.ser.read_until(b'\n', size=128)
+    
+    def get_status_triplet(self):
+        # Mode, load state and error code in one round trip
+        parts = self.query('MODE?;:LOAD?;:ERR?').split(';')
+        if len(parts) < 3:
+            # Same unparseable-reply class get_readings tolerates: a
+            # short or empty reply pads with placeholders instead of
+            # blowing up the calling test on the unpack
+            parts += ['?'] * (3 - len(parts))
+        return parts[0], parts[1], parts[2]
+    
+    def get_readings(self):
+        # One compound query: three readings in a single round trip
+        resp = self.query('MEAS:VOLT?;:MEAS:CURR?;:MEAS:POW?')
+        m = self._MEAS_RE.match(resp)
+        if m is not None:
+            v, i, p = map(float, m.groups())
+        else:
+            # Short timeouts can hand back an empty or garbled reply;
+            # fall back to a plain split before giving up
+            parts = resp.split(';')
+            if len(parts) != 3:
+                raise ValueError(f"unparseable measurement reply: {resp!r}")
+            v, i, p = map(float, parts)
+        # Keep a structured copy; it is dumped once at the end of a run
+        self._samples.append({'t': time.time(), 'v': v, 'i': i, 'p': p})
+        return v, i, p
+    
+    def dump_samples(self, path):
+        # One buffered JSON write at the end instead of structured
+        # output interleaved with the hot path
+        with open(path, 'w') as f:
+            f.write(json.dumps(self._samples))
+        print(f"📄 {len(self._samples)} samples written to {path}")
+    
+    def close(self):
+        self.ser.close()
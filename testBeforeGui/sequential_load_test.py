@@ -4,9 +4,13 @@ Sequential Constant Current Load Test
 Applies a sequence of different current loads for specified durations.
 """
 
+import selectors
 import serial
+import struct
 import time
 import csv
+import queue
+import threading
 from datetime import datetime
 
 # --- Configuration ---
@@ -16,8 +20,56 @@ TEST_STEPS = [
     {"label": "Step 1", "current": 3.0, "duration": 10},
     {"label": "Step 2", "current": 2.0, "duration": 10},
 ]
+
+# Fixed SCPI frames, encoded once instead of per loop iteration
+MODE_CC = b'MODE CC\r\n'
+MEAS_VI = b'MEAS:VOLT?;:MEAS:CURR?\r\n'
+LOAD_ON = b'LOAD ON\r\n'
+LOAD_OFF = b'LOAD OFF\r\n'
+
+# Binary sidecar record: elapsed, voltage and current as little-endian float64,
+# far cheaper per sample than CSV text encoding
+_REC = struct.Struct('<ddd')
 # ---------------------
 
+def _readline(ser, sel, timeout=0.5):
+    """Accumulate one CRLF-terminated reply, waking as soon as the
+    kernel has bytes instead of blocking inside pyserial"""
+    buf = bytearray()
+    deadline = time.monotonic() + timeout
+    while not buf.endswith(b'\r\n'):
+        wait = deadline - time.monotonic()
+        if wait <= 0 or not sel.select(timeout=wait):
+            break
+        buf += ser.read(ser.in_waiting or 1)
+    return bytes(buf)
+
+def _sampler(ser, sel, q, stop, period, duration):
+    """Producer: only serial I/O runs on this thread, so the sampling
+    cadence cannot be disturbed by printing or CSV formatting."""
+    # One wall-clock reference plus monotonic offsets: the hot loop
+    # touches only time.monotonic(), which is cheaper and immune to
+    # NTP steps on long runs
+    start_time = time.time()
+    start = time.monotonic()
+    deadline = start + duration
+    # Absolute-deadline pacing on the monotonic clock: the cadence
+    # cannot drift with iteration cost or clock steps
+    next_tick = start + period
+    while not stop.is_set() and (now := time.monotonic()) < deadline:
+        elapsed = now - start
+        # One compound query instead of two round trips;
+        # read_until returns as soon as the terminator arrives
+        ser.write(MEAS_VI)
+        # Raw bytes go onto the queue; the consumer decodes once
+        reply = _readline(ser, sel).strip()
+        q.put((start_time + elapsed, elapsed, reply))
+        # Wait out the rest of the period; stop cuts the wait short
+        stop.wait(max(0, next_tick - time.monotonic()))
+        next_tick += period
+
+    q.put(None)  # end-of-step sentinel
+
 def run_sequential_test():
     """Connects, runs a sequence of CC load tests, and disconnects."""
     ser = None
@@ -31,18 +83,30 @@ def run_sequential_test():
 
     try:
         # Create CSV file and writer
-        with open(filename, 'w', newline='') as csvfile:
+        with open(filename, 'w', newline='', buffering=64 * 1024) as csvfile, \
+             open(filename + '.f64', 'wb', buffering=1 << 20) as f_bin:
             csv_writer = csv.writer(csvfile)
             # Write header row
-            csv_writer.writerow(['timestamp_iso', 'elapsed_s', 'step_label', 'target_current_A', 'voltage_V', 'current_A'])
+            csv_writer.writerow(['timestamp_unix', 'elapsed_s', 'step_label', 'target_current_A', 'voltage_V', 'current_A'])
 
             # 1. Connect to the device
-            ser = serial.Serial(port=SERIAL_PORT, baudrate=BAUD_RATE, timeout=2)
+            # A short timeout bounds each read; the terminator, not a fixed
+            # sleep, decides when a reply is complete
+            ser = serial.Serial(port=SERIAL_PORT, baudrate=BAUD_RATE, timeout=0.5)
+            # FTDI adapters buffer replies for up to 16 ms by default;
+            # low-latency mode cuts that to ~1 ms where the driver supports it
+            try:
+                ser.set_low_latency_mode(True)
+            except (IOError, OSError, NotImplementedError):
+                pass
+            # Watch the port's fd so reads return the moment bytes arrive
+            sel = selectors.DefaultSelector()
+            sel.register(ser.fileno(), selectors.EVENT_READ)
             print("✅ Connection established.")
             time.sleep(1)
 
             # Set CC mode once at the beginning
-            ser.write(b'MODE CC\r\n')
+            ser.write(MODE_CC)
             time.sleep(0.2)
             print("✅ Mode set to CC.")
 
@@ -54,49 +118,63 @@ def run_sequential_test():
 
                 print(f"\n--- Starting {label}: {target_current}A for {duration}s ---")
 
-                # 2. Set current for the current step
-                ser.write(f'CC:HIGH {target_current}\r\n'.encode())
+                # 2. Set current for the current step (encoded once per step)
+                set_current_cmd = f'CC:HIGH {target_current}\r\n'.encode()
+                ser.write(set_current_cmd)
                 time.sleep(0.2)
                 print(f"✅ Current target set to {target_current}A.")
 
-                # 3. Start the load for this step
-                ser.write(b'LOAD ON\r\n')
-                start_time = time.time()
+                # 3. Start the load for this step and hand the serial
+                # port to a background sampler; this thread only formats,
+                # prints and buffers CSV rows
+                ser.write(LOAD_ON)
+                q = queue.Queue()
+                stop = threading.Event()
+                sampler = threading.Thread(target=_sampler,
+                                           args=(ser, sel, q, stop, 1.0, duration),
+                                           daemon=True)
+                sampler.start()
                 
+                rows = []
                 print("Time  | Voltage | Current")
                 print("---------------------------")
 
-                while (time.time() - start_time) < duration:
-                    elapsed = time.time() - start_time
-                    
-                    # Request measurements
-                    ser.write(b'MEAS:VOLT?\r\n')
-                    time.sleep(0.1)
-                    voltage = ser.readline().decode().strip()
-                    
-                    ser.write(b'MEAS:CURR?\r\n')
-                    time.sleep(0.1)
-                    current = ser.readline().decode().strip()
+                for ts, elapsed, reply in iter(q.get, None):
+                    # An empty or partial reply (the sampler hands over
+                    # whatever arrived before its deadline) is one lost
+                    # sample, not a reason to abort the step
+                    try:
+                        voltage, current = reply.decode().split(';')
+                        v_num, i_num = float(voltage), float(current)
+                    except ValueError:
+                        print(f"{elapsed:04.1f}s | unparseable reply: {reply!r}")
+                        continue
                     
                     print(f"{elapsed:04.1f}s | {voltage:>7}V | {current:>9}A")
                     
-                    # Write data to CSV
-                    csv_writer.writerow([
-                        datetime.now().isoformat(),
+                    # Buffer the row; the float epoch goes in as-is and
+                    # consumers format it, saving a datetime per sample
+                    rows.append([
+                        ts,
                         f"{elapsed:.2f}",
                         label,
                         target_current,
                         voltage,
                         current
                     ])
-                    
-                    # Wait until the next second
-                    time.sleep(max(0, 1.0 - (time.time() - start_time - elapsed)))
+                    # Analysis-friendly copy of the same sample
+                    f_bin.write(_REC.pack(elapsed, v_num, i_num))
+
+                stop.set()
+                sampler.join()
 
+                # One batched write + flush per step boundary
+                csv_writer.writerows(rows)
+                csvfile.flush()
                 print("---------------------------")
                 print(f"⏹️ {label} complete.")
                 # Briefly turn off load between steps for safety
-                ser.write(b'LOAD OFF\r\n')
+                ser.write(LOAD_OFF)
                 time.sleep(0.5)
 
     except serial.SerialException as e:
@@ -110,7 +188,7 @@ def run_sequential_test():
         if ser and ser.is_open:
             print("\nDisabling load and closing connection...")
             # Ensure load is off at the very end
-            ser.write(b'LOAD OFF\r\n')
+            ser.write(LOAD_OFF)
             ser.close()
             print("✅ Load disabled. Connection closed.")
         
@@ -4,34 +4,9 @@ Simple 9V Current Draw Test
 Try to get ANY current reading with 9V source
 """
 
-import serial
-import time
+from scpi_load import ScpiLoad
 
-class Simple9VTest:
-    def __init__(self, port='/dev/ttyUSB0'):
-        self.ser = serial.Serial(
-            port=port, baudrate=115200, bytesize=8, 
-            parity='N', stopbits=1, timeout=2,
-            xonxoff=False, rtscts=False, dsrdtr=False
-        )
-        time.sleep(1)
-        self.ser.flushInput()
-        self.ser.flushOutput()
-        
-    def send(self, cmd):
-        self.ser.write((cmd + '\r\n').encode())
-        time.sleep(0.5)
-        
-    def query(self, cmd):
-        self.send(cmd)
-        return self.ser.readline().decode().strip()
-    
-    def get_readings(self):
-        v = float(self.query('MEAS:VOLT?'))
-        i = float(self.query('MEAS:CURR?'))
-        p = float(self.query('MEAS:POW?'))
-        return v, i, p
-    
+class Simple9VTest(ScpiLoad):
     def test_gradual_current_increase(self):
         """Test gradually increasing current values"""
         print("=== 9V SOURCE CURRENT DRAW TEST ===")
@@ -40,27 +15,23 @@ class Simple9VTest:
         # Start with very small currents
         test_currents = [0.1, 0.2, 0.5, 1.0, 2.0]
         
+        # The mode never changes across iterations, so set it once
+        self.send('MODE CC')
+        self._sync()
+        
         for target_current in test_currents:
             print(f"\n--- Testing {target_current}A ---")
             
-            # Reset and set mode
-            self.send('LOAD OFF')
-            time.sleep(0.2)
-            self.send('MODE CC')  # Try explicit CC mode
-            time.sleep(0.2)
-            
-            # Set current
-            self.send(f'CURR {target_current}')
-            time.sleep(0.2)
+            # Reset and set the new current target in one chained write
+            self.send_many(['LOAD OFF', f'CURR {target_current}'])
+            self._sync()
             
             # Enable load
             self.send('LOAD ON')
-            time.sleep(1)  # Wait for settling
+            self._settle(1)  # Wait for settling
             
             # Check status
-            mode = self.query('MODE?')
-            load_status = self.query('LOAD?')
-            error = self.query('ERR?')
+            mode, load_status, error = self.get_status_triplet()
             
             # Get readings
             v, i, p = self.get_readings()
@@ -74,7 +45,7 @@ class Simple9VTest:
                 # Test a few more readings to confirm
                 print("Confirming with multiple readings:")
                 for j in range(3):
-                    time.sleep(1)
+                    self._settle(1)
                     v, i, p = self.get_readings()
                     print(f"  Reading {j+1}: {v:.3f}V, {i:.6f}A, {p:.3f}W")
                 
@@ -99,12 +70,13 @@ class Simple9VTest:
         ]
         
         print("Current device settings:")
-        for query in queries:
-            try:
-                response = self.query(query)
+        try:
+            # All six settings come back in one compound response
+            responses = self.query(';:'.join(queries)).split(';')
+            for query, response in zip(queries, responses):
                 print(f"  {query} → {response}")
-            except Exception as e:
-                print(f"  {query} → Error: {e}")
+        except Exception as e:
+            print(f"  Settings query → Error: {e}")
         
         print("\n💡 SUGGESTION:")
         print("1. Check FRONT PANEL of the device:")
@@ -121,17 +93,17 @@ class Simple9VTest:
         
         # Measure with load off
         self.send('LOAD OFF')
-        time.sleep(1)
+        self._settle(1)
         v_off, i_off, p_off = self.get_readings()
         print(f"Load OFF: {v_off:.3f}V, {i_off:.6f}A, {p_off:.3f}W")
         
         # Set a reasonable current
         self.send('CURR 0.5')
-        time.sleep(0.2)
+        self._settle(0.2)
         
         # Measure with load on
         self.send('LOAD ON')
-        time.sleep(2)  # Longer wait
+        self._settle(2)  # Longer wait
         v_on, i_on, p_on = self.get_readings()
         print(f"Load ON:  {v_on:.3f}V, {i_on:.6f}A, {p_on:.3f}W")
         
@@ -166,9 +138,7 @@ class Simple9VTest:
         
         finally:
             self.send('LOAD OFF')
-    
-    def close(self):
-        self.ser.close()
+
 
 def main():
     tester = Simple9VTest()
@@ -184,6 +154,7 @@ def main():
             print("4. Verify connections are secure")
             
     finally:
+        tester.dump_samples('simple_9v_samples.json')
         tester.close()
 
 if __name__ == "__main__":
@@ -4,34 +4,9 @@ Realistic 9V Source Testing
 Test what we CAN do with 9V source
 """
 
-import serial
-import time
+from scpi_load import ScpiLoad
 
-class Realistic9VTest:
-    def __init__(self, port='/dev/ttyUSB0'):
-        self.ser = serial.Serial(
-            port=port, baudrate=115200, bytesize=8, 
-            parity='N', stopbits=1, timeout=2,
-            xonxoff=False, rtscts=False, dsrdtr=False
-        )
-        time.sleep(1)
-        self.ser.flushInput()
-        self.ser.flushOutput()
-        
-    def send(self, cmd):
-        self.ser.write((cmd + '\r\n').encode())
-        time.sleep(0.5)
-        
-    def query(self, cmd):
-        self.send(cmd)
-        return self.ser.readline().decode().strip()
-    
-    def get_readings(self):
-        v = float(self.query('MEAS:VOLT?'))
-        i = float(self.query('MEAS:CURR?'))
-        p = float(self.query('MEAS:POW?'))
-        return v, i, p
-    
+class Realistic9VTest(ScpiLoad):
     def test_cc_mode_with_9v(self):
         """Test CC (Constant Current) mode with 9V source"""
         print("=== CC MODE TEST (9V Source) ===")
@@ -40,20 +15,16 @@ class Realistic9VTest:
         # Test different current values that 9V source can provide
         test_currents = [0.1, 0.25, 0.5, 0.75, 1.0]
         
+        # The mode never changes across iterations, so set it once
+        self.send('MODE CC')
+        self._sync()
+        
         for target_i in test_currents:
             print(f"\n--- Testing {target_i}A Current Draw ---")
             
-            # Reset
-            self.send('LOAD OFF')
-            time.sleep(0.2)
-            
-            # Set CC mode
-            self.send('MODE CC')
-            time.sleep(0.2)
-            
-            # Set current
-            self.send(f'CURR {target_i}')
-            time.sleep(0.2)
+            # Reset and set the new current target in one chained write
+            self.send_many(['LOAD OFF', f'CURR {target_i}'])
+            self._sync()
             
             # Measure before load
             v_before, i_before, p_before = self.get_readings()
@@ -61,12 +32,11 @@ class Realistic9VTest:
             
             # Enable load
             self.send('LOAD ON')
-            time.sleep(1)
+            self._settle(1)
             
             # Measure with load
             v_after, i_after, p_after = self.get_readings()
-            mode = self.query('MODE?')
-            load_status = self.query('LOAD?')
+            mode, load_status, _ = self.get_status_triplet()
             
             print(f"After:  {v_after:.3f}V, {i_after:.6f}A, {p_after:.3f}W")
             print(f"Mode: {mode}, Load: {load_status}")
@@ -90,23 +60,20 @@ class Realistic9VTest:
         # 9V source can provide these CV voltages
         test_voltages = [6.0, 7.0, 8.0, 8.5]
         
+        # The mode never changes across iterations, so set it once
+        self.send('MODE CV')
+        self._sync()
+        
         for target_v in test_voltages:
             print(f"\n--- Testing CV {target_v}V ---")
             
-            self.send('LOAD OFF')
-            time.sleep(0.2)
-            
-            # Set CV mode  
-            self.send('MODE CV')
-            time.sleep(0.2)
-            
-            # Set voltage (lower than 9V source)
-            self.send(f'VOLT {target_v}')
-            time.sleep(0.2)
+            # Reset and set a voltage lower than the 9V source
+            self.send_many(['LOAD OFF', f'VOLT {target_v}'])
+            self._sync()
             
             # Enable load
             self.send('LOAD ON')
-            time.sleep(1)
+            self._settle(1)
             
             v, i, p = self.get_readings()
             mode = self.query('MODE?')
@@ -124,19 +91,15 @@ class Realistic9VTest:
         print("Showing what happens when CV voltage > source voltage...")
         
         # Try to set CV to 12V with 9V source (impossible)
-        self.send('LOAD OFF')
-        time.sleep(0.2)
-        
         print("Setting CV mode to 12V (higher than 9V source)...")
-        self.send('MODE CV')
-        self.send('VOLT 12.0')
-        time.sleep(0.2)
+        self.send_many(['LOAD OFF', 'MODE CV', 'VOLT 12.0'])
+        self._sync()
         
         v_before, _, _ = self.get_readings()
         print(f"Before load: {v_before:.3f}V")
         
         self.send('LOAD ON')
-        time.sleep(1)
+        self._settle(1)
         
         v_after, i_after, p_after = self.get_readings()
         print(f"With load:   {v_after:.3f}V, {i_after:.6f}A, {p_after:.3f}W")
@@ -152,20 +115,19 @@ class Realistic9VTest:
         # Test reasonable power levels for 9V source
         test_powers = [2.0, 5.0, 8.0]  # Watts
         
+        # The mode never changes across iterations, so set it once
+        self.send('MODE CP')
+        self._sync()
+        
         for target_p in test_powers:
             print(f"\n--- Testing {target_p}W Power ---")
             
-            self.send('LOAD OFF')
-            time.sleep(0.2)
-            
-            self.send('MODE CP')
-            time.sleep(0.2)
-            
-            self.send(f'POW {target_p}')
-            time.sleep(0.2)
+            # Reset and set the new power target in one chained write
+            self.send_many(['LOAD OFF', f'POW {target_p}'])
+            self._sync()
             
             self.send('LOAD ON')
-            time.sleep(1)
+            self._settle(1)
             
             v, i, p = self.get_readings()
             expected_current = target_p / v if v > 0 else 0
@@ -198,9 +160,7 @@ class Realistic9VTest:
             
         finally:
             self.send('LOAD OFF')
-    
-    def close(self):
-        self.ser.close()
+
 
 def main():
     print("=== UNDERSTANDING ELECTRONIC LOAD ===")
@@ -222,6 +182,7 @@ def main():
         print("❌ Cannot create higher voltage than source!")
         
     finally:
+        tester.dump_samples('realistic_9v_samples.json')
         tester.close()
 
 if __name__ == "__main__":